@@ -1,8 +1,9 @@
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import os
 import sys
+import atexit
 import json
 import random
 import time
@@ -26,7 +27,21 @@ ai_entity = AIEntity()
 market_data = MarketDataService()
 news_room = NewsRoomService()
 openai_service = OpenAIService()
-scanner_service = ScannerService()
+scanner_service = ScannerService(market_data)
+
+# Time-of-day volume profiles for RVOL, built in the background and refreshed nightly
+market_data.start_volume_profiles(scanner_service.scan_symbols)
+# Options flow is detected by a background poller; /api/options-flow serves its latest results
+market_data.start_options_flow_monitoring()
+# News feeds are polled on their adaptive schedules; new stories reach /api/news/stream through the bus
+news_room.start_monitoring()
+
+
+@atexit.register
+def stop_background_monitors():
+    news_room.stop_monitoring()
+    market_data.stop_options_flow_monitoring()
+    market_data.volume_profiles.stop_nightly_refresh()
 
 # Global state
 platform_state = {
@@ -162,6 +177,24 @@ def get_options_flow():
             'data': generate_mock_options_flow()
         })
 
+@app.route('/api/options/analytics', methods=['GET'])
+def get_options_analytics():
+    """Implied volatility and Greeks for one option chain: ?symbol=&expiration= (default: nearest)"""
+    try:
+        symbol = request.args.get('symbol', 'AAPL').upper()
+        analytics = market_data.get_option_chain_analytics(symbol, request.args.get('expiration'))
+        return jsonify({
+            'success': analytics is not None,
+            'data': analytics or {},
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': {}
+        })
+
 @app.route('/api/ai/strategies', methods=['POST'])
 def generate_ai_strategies():
     """Generate AI trading strategies"""
@@ -191,7 +224,8 @@ def get_ai_predictions():
         symbol = data.get('symbol', 'AAPL')
         time_horizon = data.get('timeHorizon', '1d')
         
-        prediction = openai_service.get_market_prediction(symbol, time_horizon)
+        quote = market_data.get_stock_data(symbol)
+        prediction = openai_service.get_market_prediction(symbol, time_horizon, quote)
         
         return jsonify({
             'success': True,
@@ -207,6 +241,79 @@ def get_ai_predictions():
             'prediction': f"Error analyzing {symbol}: {str(e)}"
         })
 
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def sse_response(events):
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/ai/predictions/stream', methods=['GET', 'POST'])
+def stream_ai_predictions():
+    """Stream AI market prediction tokens as server-sent events"""
+    data = request.get_json(silent=True) or request.args
+    symbol = data.get('symbol', 'AAPL').upper()
+    time_horizon = data.get('timeHorizon', '1d')
+    
+    def generate():
+        yield sse_event('start', {'symbol': symbol, 'time_horizon': time_horizon})
+        try:
+            quote = market_data.get_stock_data(symbol)
+            for event in openai_service.stream_market_prediction(symbol, time_horizon, quote):
+                if event['type'] == 'token':
+                    yield sse_event('token', {'text': event['text']})
+                else:
+                    yield sse_event('summary', {
+                        'success': True,
+                        'symbol': symbol,
+                        'prediction': event['data'],
+                        'time_horizon': time_horizon,
+                        'timestamp': datetime.now().isoformat()
+                    })
+        except Exception as e:
+            yield sse_event('error', {'success': False, 'error': str(e)})
+        yield sse_event('done', {})
+    
+    return sse_response(generate())
+
+@app.route('/api/ai/strategy-room/stream', methods=['GET', 'POST'])
+def stream_strategy_room():
+    """Stream the strategy room trade plan, then the structured analysis"""
+    data = request.get_json(silent=True) or request.args
+    symbol = data.get('symbol', 'AAPL').upper()
+    
+    def generate():
+        yield sse_event('start', {'symbol': symbol})
+        try:
+            # Structured multi-expert analysis runs while the narrative streams
+            result = {}
+            worker = threading.Thread(
+                target=lambda: result.update(analysis=scanner_service.analyze_symbol_strategy(symbol)),
+                daemon=True
+            )
+            worker.start()
+            
+            stock_data = market_data.get_stock_data(symbol) or {'symbol': symbol}
+            stock_data = {**stock_data, 'news': news_room.news_index.for_symbol(symbol, 5)}
+            for token in openai_service.stream_strategy_commentary(symbol, stock_data):
+                yield sse_event('token', {'text': token})
+            
+            worker.join()
+            yield sse_event('summary', {
+                'success': True,
+                'symbol': symbol,
+                'data': result.get('analysis'),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            yield sse_event('error', {'success': False, 'error': str(e)})
+        yield sse_event('done', {})
+    
+    return sse_response(generate())
+
 @app.route('/api/ai/autonomous/status', methods=['GET'])
 def get_aria_status():
     """Get ARIA autonomous AI status"""
@@ -269,8 +376,17 @@ def stop_aria():
 
 @app.route('/api/news', methods=['GET'])
 def get_news():
-    """Get financial news with AI sentiment analysis"""
+    """Get financial news with AI sentiment analysis; ?symbol= limits it to one ticker"""
     try:
+        symbol = request.args.get('symbol', '').strip().upper()
+        if symbol:
+            return jsonify({
+                'success': True,
+                'symbol': symbol,
+                'data': news_room.get_news_for_symbol(symbol, int(request.args.get('limit', 20))),
+                'timestamp': datetime.now().isoformat()
+            })
+        
         news_items = news_room.get_latest_news()
         
         if not news_items:
@@ -290,6 +406,123 @@ def get_news():
             'data': generate_mock_news()
         })
 
+@app.route('/api/news/sources', methods=['GET'])
+def get_news_sources():
+    """Per-feed polling schedule: current interval, recent publish rate and last fetch status"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': news_room.get_feed_schedule(),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        })
+
+def parse_time_param(value):
+    """Epoch seconds from an epoch number or an ISO date/datetime query parameter"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@app.route('/api/news/sentiment', methods=['GET'])
+def get_news_sentiment():
+    """Headline sentiment aggregated per ticker: ?since= (default: last 24 hours)"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': news_room.get_symbol_sentiment(since=parse_time_param(request.args.get('since'))),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': {}
+        })
+
+@app.route('/api/news/event-study', methods=['GET'])
+def get_news_event_study():
+    """Average abnormal returns after archived news by catalyst and sentiment: ?since=&until="""
+    try:
+        started = time.time()
+        report = news_room.get_event_study(
+            since=parse_time_param(request.args.get('since')),
+            until=parse_time_param(request.args.get('until'))
+        )
+        return jsonify({
+            'success': True,
+            'data': report,
+            'elapsed_seconds': round(time.time() - started, 2),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': {}
+        })
+
+@app.route('/api/news/stream', methods=['GET'])
+def stream_news():
+    """Push newly ingested news as server-sent events: ?symbols=AAPL,TSLA&catalysts=FDA,EARNINGS"""
+    symbols = [s.strip() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    catalysts = [c.strip() for c in request.args.get('catalysts', '').split(',') if c.strip()]
+    
+    def generate():
+        subscription = news_room.news_bus.subscribe(symbols, catalysts)
+        dropped = 0
+        try:
+            yield sse_event('start', {'symbols': sorted(subscription.symbols),
+                                      'catalysts': sorted(subscription.catalysts)})
+            while True:
+                items = subscription.get(timeout=15)
+                if subscription.dropped > dropped:
+                    yield sse_event('lagged', {'dropped': subscription.dropped - dropped})
+                    dropped = subscription.dropped
+                for item in items:
+                    yield sse_event('news', item)
+                if not items:
+                    # Keeps proxies from closing an idle stream and surfaces client disconnects
+                    yield sse_event('ping', {'timestamp': datetime.now().isoformat()})
+        finally:
+            news_room.news_bus.unsubscribe(subscription)
+    
+    return sse_response(generate())
+
+@app.route('/api/news/search', methods=['GET'])
+def search_news():
+    """Search archived news: ?q=&symbol=&catalyst=&since=&until=&limit="""
+    try:
+        started = time.time()
+        results = news_room.search_news(
+            query=request.args.get('q'),
+            symbol=request.args.get('symbol'),
+            catalyst=request.args.get('catalyst'),
+            since=parse_time_param(request.args.get('since')),
+            until=parse_time_param(request.args.get('until')),
+            limit=min(int(request.args.get('limit', 50)), 500)
+        )
+        return jsonify({
+            'success': True,
+            'data': results,
+            'count': len(results),
+            'query_ms': round((time.time() - started) * 1000, 2),
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        })
+
 @app.route('/api/ai/providers/status', methods=['GET'])
 def get_ai_providers_status():
     """Get AI providers status and performance"""
@@ -304,6 +537,7 @@ def get_ai_providers_status():
         return jsonify({
             'success': True,
             'data': providers,
+            'hedging': openai_service.hedge_budget.stats(),
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -0,0 +1,318 @@
+"""Offline stand-in for the OpenAI and Anthropic HTTP APIs.
+
+Speaks the chat-completions and messages wire formats used by OpenAIService,
+including streaming and usage reporting, with configurable latency and error
+rates, so the AI layer can be load-tested without keys or network:
+
+    python llm_standin_server.py --profile typical --port 8765
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=test \\
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765/v1 ANTHROPIC_API_KEY=test python app.py
+
+Latency is a lognormal time to first token (median and sigma) plus a fixed
+per-token generation time. Token counts use a 4-characters-per-token estimate.
+"""
+import re
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from typing import Dict, List, Optional
+from flask import Flask, Response, jsonify, request
+
+# Time to first token (median ms, lognormal sigma), generation speed and failure rates
+PROFILES = {
+    'instant': {'ttft_ms': 0, 'sigma': 0.0, 'tokens_per_second': 0, 'error_rate': 0.0, 'rate_limit_rate': 0.0},
+    'fast': {'ttft_ms': 250, 'sigma': 0.3, 'tokens_per_second': 200, 'error_rate': 0.0, 'rate_limit_rate': 0.0},
+    'typical': {'ttft_ms': 700, 'sigma': 0.5, 'tokens_per_second': 80, 'error_rate': 0.01, 'rate_limit_rate': 0.01},
+    'slow': {'ttft_ms': 2000, 'sigma': 0.6, 'tokens_per_second': 30, 'error_rate': 0.02, 'rate_limit_rate': 0.02},
+    'flaky': {'ttft_ms': 900, 'sigma': 1.0, 'tokens_per_second': 60, 'error_rate': 0.15, 'rate_limit_rate': 0.10}
+}
+
+_SCHEMA_FIELD_RE = re.compile(r'"(\w+)":\s*("[^"]*"|[\w.|-]+)')
+_TOKEN_RE = re.compile(r'\S+\s*')
+
+FILLER = (
+    "Price is holding above the prior session high on rising volume, momentum favours continuation "
+    "while the broader tape stays constructive; a close back below support would invalidate the setup."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(len(text or '') // 4, 1)
+
+
+class StandInModel:
+    """Latency, failure and reply generation shared by both wire formats"""
+
+    def __init__(self, profile: Dict, seed: Optional[int] = None):
+        self.profile = dict(profile)
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'streams': 0, 'errors': 0, 'rate_limited': 0,
+                      'input_tokens': 0, 'output_tokens': 0}
+        self._lock = threading.Lock()
+
+    def count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def first_token_delay(self) -> float:
+        median = self.profile['ttft_ms'] / 1000.0
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            return median * self.random.lognormvariate(0.0, self.profile['sigma'])
+
+    def token_delay(self) -> float:
+        tps = self.profile['tokens_per_second']
+        return 1.0 / tps if tps > 0 else 0.0
+
+    def failure(self) -> Optional[str]:
+        """'rate_limit', 'error' or None for this request"""
+        with self._lock:
+            roll = self.random.random()
+        if roll < self.profile['rate_limit_rate']:
+            return 'rate_limit'
+        if roll < self.profile['rate_limit_rate'] + self.profile['error_rate']:
+            return 'error'
+        return None
+
+    def reply(self, prompt: str, json_output: bool) -> str:
+        """Plausible reply: JSON shaped after the schema the prompt asks for, else prose"""
+        if not json_output and 'JSON only' not in prompt:
+            return FILLER
+
+        with self._lock:
+            rng = random.Random(self.random.random())
+
+        if '"results"' in prompt:
+            symbols = self._batch_symbols(prompt)
+            return json.dumps({'results': [
+                {'symbol': s, 'signal': rng.choice(['BUY', 'SELL', 'HOLD']),
+                 'confidence': rng.randint(40, 95), 'commentary': FILLER.split(',')[0]}
+                for s in symbols
+            ]})
+
+        schema = prompt[prompt.find('JSON only'):]
+        price = self._prompt_price(prompt)
+        reply = {}
+        for key, spec in _SCHEMA_FIELD_RE.findall(schema):
+            if '|' in spec:
+                reply[key] = rng.choice(spec.strip('"').split('|'))
+            elif spec == 'float':
+                reply[key] = round(price * rng.uniform(0.95, 1.15), 2)
+            elif spec == '0-100':
+                reply[key] = rng.randint(40, 95)
+            elif 'NN%' in spec:
+                reply[key] = f"{rng.randint(30, 85)}%"
+            else:
+                reply[key] = FILLER.split(';')[0]
+        return json.dumps(reply)
+
+    @staticmethod
+    def _batch_symbols(prompt: str) -> List[str]:
+        lines = prompt.splitlines()
+        start = next((i for i, line in enumerate(lines) if line.startswith('symbol,')), None)
+        if start is None:
+            return []
+        symbols = []
+        for line in lines[start + 1:]:
+            if ',' not in line or line.startswith('Reply'):
+                break
+            symbols.append(line.split(',')[0])
+        return symbols
+
+    @staticmethod
+    def _prompt_price(prompt: str) -> float:
+        match = re.search(r'(?:\$|\bpx )(\d+(?:\.\d+)?)', prompt)
+        return float(match.group(1)) if match else 100.0
+
+
+def _limit_tokens(text: str, max_tokens: int) -> tuple:
+    """Split into output tokens, capped at max_tokens; returns (tokens, truncated)"""
+    tokens = _TOKEN_RE.findall(text)
+    return tokens[:max_tokens], len(tokens) > max_tokens
+
+
+def _sse(payload: Dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ''
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
+def create_app(model: StandInModel) -> Flask:
+    app = Flask(__name__)
+
+    def openai_error(kind: str):
+        model.count(**{'rate_limited' if kind == 'rate_limit' else 'errors': 1})
+        if kind == 'rate_limit':
+            return jsonify({'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}}), 429
+        return jsonify({'error': {'message': 'The server had an error', 'type': 'server_error'}}), 500
+
+    def anthropic_error(kind: str):
+        model.count(**{'rate_limited' if kind == 'rate_limit' else 'errors': 1})
+        if kind == 'rate_limit':
+            return jsonify({'type': 'error', 'error': {'type': 'rate_limit_error', 'message': 'Rate limited'}}), 429
+        return jsonify({'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'Overloaded'}}), 529
+
+    @app.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(force=True)
+        messages = body.get('messages', [])
+        prompt = '\n'.join(str(m.get('content', '')) for m in messages)
+        json_output = (body.get('response_format') or {}).get('type') == 'json_object'
+        max_tokens = int(body.get('max_tokens') or 1024)
+        model_name = body.get('model', 'standin')
+        model.count(requests=1)
+
+        delay = model.first_token_delay()
+        failure = model.failure()
+        if failure:
+            time.sleep(delay)
+            return openai_error(failure)
+
+        tokens, truncated = _limit_tokens(model.reply(prompt, json_output), max_tokens)
+        input_tokens = estimate_tokens(prompt)
+        model.count(input_tokens=input_tokens, output_tokens=len(tokens))
+        usage = {'prompt_tokens': input_tokens, 'completion_tokens': len(tokens),
+                 'total_tokens': input_tokens + len(tokens)}
+        finish_reason = 'length' if truncated else 'stop'
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        if not body.get('stream'):
+            time.sleep(delay + model.token_delay() * len(tokens))
+            return jsonify({
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model_name,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                             'finish_reason': finish_reason}],
+                'usage': usage
+            })
+
+        include_usage = (body.get('stream_options') or {}).get('include_usage')
+        model.count(streams=1)
+
+        def generate():
+            def chunk(delta, finish=None):
+                return _sse({'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                             'model': model_name,
+                             'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}]})
+
+            time.sleep(delay)
+            yield chunk({'role': 'assistant', 'content': ''})
+            for token in tokens:
+                yield chunk({'content': token})
+                time.sleep(model.token_delay())
+            yield chunk({}, finish_reason)
+            if include_usage:
+                yield _sse({'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                            'model': model_name, 'choices': [], 'usage': usage})
+            yield 'data: [DONE]\n\n'
+
+        return Response(generate(), mimetype='text/event-stream')
+
+    @app.route('/v1/messages', methods=['POST'])
+    def messages():
+        body = request.get_json(force=True)
+        messages = body.get('messages', [])
+        prompt = '\n'.join([str(body.get('system', ''))] + [str(m.get('content', '')) for m in messages])
+        prefill = messages[-1].get('content', '') if messages and messages[-1].get('role') == 'assistant' else ''
+        max_tokens = int(body.get('max_tokens') or 1024)
+        model_name = body.get('model', 'standin')
+        model.count(requests=1)
+
+        delay = model.first_token_delay()
+        failure = model.failure()
+        if failure:
+            time.sleep(delay)
+            return anthropic_error(failure)
+
+        text = model.reply(prompt, json_output=prefill.startswith('{'))
+        if prefill and text.startswith(prefill):
+            # The reply continues the prefilled assistant turn
+            text = text[len(prefill):]
+        tokens, truncated = _limit_tokens(text, max_tokens)
+        input_tokens = estimate_tokens(prompt)
+        model.count(input_tokens=input_tokens, output_tokens=len(tokens))
+        stop_reason = 'max_tokens' if truncated else 'end_turn'
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+
+        if not body.get('stream'):
+            time.sleep(delay + model.token_delay() * len(tokens))
+            return jsonify({
+                'id': message_id,
+                'type': 'message',
+                'role': 'assistant',
+                'model': model_name,
+                'content': [{'type': 'text', 'text': ''.join(tokens)}],
+                'stop_reason': stop_reason,
+                'stop_sequence': None,
+                'usage': {'input_tokens': input_tokens, 'output_tokens': len(tokens)}
+            })
+
+        model.count(streams=1)
+
+        def generate():
+            time.sleep(delay)
+            yield _sse({'type': 'message_start', 'message': {
+                'id': message_id, 'type': 'message', 'role': 'assistant', 'model': model_name, 'content': [],
+                'stop_reason': None, 'stop_sequence': None,
+                'usage': {'input_tokens': input_tokens, 'output_tokens': 1}}}, 'message_start')
+            yield _sse({'type': 'content_block_start', 'index': 0,
+                        'content_block': {'type': 'text', 'text': ''}}, 'content_block_start')
+            for token in tokens:
+                yield _sse({'type': 'content_block_delta', 'index': 0,
+                            'delta': {'type': 'text_delta', 'text': token}}, 'content_block_delta')
+                time.sleep(model.token_delay())
+            yield _sse({'type': 'content_block_stop', 'index': 0}, 'content_block_stop')
+            yield _sse({'type': 'message_delta', 'delta': {'stop_reason': stop_reason, 'stop_sequence': None},
+                        'usage': {'output_tokens': len(tokens)}}, 'message_delta')
+            yield _sse({'type': 'message_stop'}, 'message_stop')
+
+        return Response(generate(), mimetype='text/event-stream')
+
+    @app.route('/standin/profile', methods=['GET', 'POST'])
+    def profile():
+        """Read or change the latency/error profile while a benchmark is running"""
+        if request.method == 'POST':
+            update = request.get_json(force=True) or {}
+            if update.get('profile') in PROFILES:
+                model.profile.update(PROFILES[update['profile']])
+            model.profile.update({k: type(model.profile[k])(v) for k, v in update.items() if k in model.profile})
+        return jsonify(model.profile)
+
+    @app.route('/standin/stats')
+    def stats():
+        return jsonify(model.stats)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline stand-in for the OpenAI and Anthropic APIs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='typical')
+    parser.add_argument('--ttft-ms', type=float, help='median time to first token')
+    parser.add_argument('--sigma', type=float, help='lognormal spread of time to first token')
+    parser.add_argument('--tokens-per-second', type=float, help='generation speed; 0 for instant')
+    parser.add_argument('--error-rate', type=float, help='fraction of requests answered with a 5xx')
+    parser.add_argument('--rate-limit-rate', type=float, help='fraction of requests answered with a 429')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    profile = dict(PROFILES[args.profile])
+    for key in profile:
+        value = getattr(args, key)
+        if value is not None:
+            profile[key] = value
+
+    print(f"🧪 LLM stand-in on http://{args.host}:{args.port}/v1 with profile {profile}")
+    create_app(StandInModel(profile, args.seed)).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -105,6 +105,34 @@ def get_aria_status():
         pass
     return {"isRunning": False, "autonomyLevel": 0, "performance": 0}
 
+def stream_events(url, payload, fallback_url=None):
+    """Yield (event, data) pairs from a server-sent event endpoint.
+
+    If the stream is refused, the non-streaming fallback_url is polled once and
+    its reply yielded as the summary; failing that, an error event is yielded.
+    """
+    # Short connect timeout; the read timeout only bounds the gap between events
+    with requests.post(url, json=payload, stream=True, timeout=(5, 30)) as response:
+        if response.status_code != 200 or 'text/event-stream' not in response.headers.get('Content-Type', ''):
+            error = f"Stream unavailable (HTTP {response.status_code})"
+            if fallback_url:
+                fallback = requests.post(fallback_url, json=payload, timeout=60)
+                if fallback.status_code == 200:
+                    yield 'summary', fallback.json()
+                    return
+                error = f"Analysis failed (HTTP {fallback.status_code})"
+            yield 'error', {'error': error}
+            return
+
+        event = 'message'
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith('event:'):
+                event = line[6:].strip()
+            elif line.startswith('data:'):
+                yield event, json.loads(line[5:].strip())
+            elif not line:
+                event = 'message'
+
 # Main content
 if page == "Dashboard":
     st.markdown('<h1 class="main-header">📊 Trading Dashboard</h1>', unsafe_allow_html=True)
@@ -173,19 +201,23 @@ elif page == "AI Analysis":
         time_horizon = st.selectbox("Time Horizon", ["1d", "1w", "1m"])
     
     if st.button("🔬 Analyze", type="primary") and symbol:
-        with st.spinner(f"Analyzing {symbol}..."):
-            try:
-                response = requests.post("http://localhost:5000/api/ai/predictions", 
-                                       json={"symbol": symbol, "timeHorizon": time_horizon},
-                                       timeout=60)
-                if response.status_code == 200:
-                    analysis = response.json()
-                    st.subheader(f"Analysis Results for {symbol}")
-                    st.json(analysis)
-                else:
-                    st.error("Analysis failed. Please check if the backend is running.")
-            except Exception as e:
-                st.error(f"Error: {str(e)}")
+        st.subheader(f"Analysis Results for {symbol}")
+        commentary = st.empty()
+        try:
+            text = ""
+            for event, data in stream_events("http://localhost:5000/api/ai/predictions/stream",
+                                             {"symbol": symbol, "timeHorizon": time_horizon},
+                                             fallback_url="http://localhost:5000/api/ai/predictions"):
+                if event == 'token':
+                    text += data.get('text', '')
+                    commentary.markdown(text + "▌")
+                elif event == 'summary':
+                    commentary.markdown(text)
+                    st.json(data)
+                elif event == 'error':
+                    st.error(f"Error: {data.get('error')}")
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
 
 elif page == "ARIA Autonomous":
     st.markdown('<h1 class="main-header">🤖 ARIA Autonomous AI</h1>', unsafe_allow_html=True)
@@ -3,10 +3,12 @@ import time
 import threading
 from datetime import datetime
 from .openai_service import OpenAIService
+from .llm_governor import PRIORITY_ARIA
 
 class AutonomousAI:
     def __init__(self):
         self.ai_service = OpenAIService()
+        self.ai_service.default_priority = PRIORITY_ARIA
         self.is_running = True
         self.monitoring_interval = 300  # 5 minutes
         
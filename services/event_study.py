@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from typing import Dict, List, Optional, Tuple
+
+# Window name -> (start, end) in bars relative to the last bar that closed before the event
+DEFAULT_WINDOWS = {'pre_30m': (-6, 0), '5m': (0, 1), '30m': (0, 6), '2h': (0, 24), '1d': (0, 78)}
+
+
+def sentiment_bucket(scores: np.ndarray) -> np.ndarray:
+    scores = np.asarray(scores, dtype=float)
+    return np.select(
+        [scores <= -2, scores < 0, scores >= 2, scores > 0],
+        ['strong_negative', 'negative', 'strong_positive', 'positive'],
+        default='neutral'
+    )
+
+
+def compute_abnormal_returns(closes: pd.DataFrame, benchmark: pd.Series, event_ts: np.ndarray,
+                             event_symbols: np.ndarray, windows: Dict[str, Tuple[int, int]],
+                             bar_seconds: Optional[int] = None) -> np.ndarray:
+    """Market-adjusted returns around every event, shape (events, windows).
+
+    `closes` is a (bar x symbol) frame of close prices and `benchmark` the
+    index's closes on the same bars. Bars are labelled by their start time and
+    last `bar_seconds` (default: the median bar spacing). Each event (epoch
+    seconds, symbol) is anchored on the last bar that had closed by then, with
+    one searchsorted over all events, so the anchor price never includes the
+    reaction. A (start, end) window is then the symbol's return from bar
+    anchor+start to anchor+end minus the benchmark's over the same bars. Every
+    lookup is a fancy index into the price matrix. Windows running off either
+    end of the bars, or touching missing prices, are NaN.
+    """
+    index = closes.index if closes.index.tz is None else closes.index.tz_convert('UTC').tz_localize(None)
+    times = np.asarray(index, dtype='datetime64[s]').astype(np.int64)
+    prices = closes.to_numpy(dtype=float)
+    bench = benchmark.reindex(closes.index).to_numpy(dtype=float)
+    columns = {symbol: i for i, symbol in enumerate(closes.columns)}
+
+    col = np.fromiter((columns.get(s, -1) for s in event_symbols), dtype=np.int64, count=len(event_symbols))
+    if bar_seconds is None:
+        bar_seconds = int(np.median(np.diff(times))) if len(times) > 1 else 0
+    anchor = np.searchsorted(times + bar_seconds, np.asarray(event_ts, dtype=float), side='right') - 1
+    known = (col >= 0) & (anchor >= 0)
+
+    result = np.full((len(col), len(windows)), np.nan)
+    last = len(times) - 1
+    for w, (start, end) in enumerate(windows.values()):
+        first, second = anchor + start, anchor + end
+        valid = known & (first >= 0) & (second <= last)
+        rows, i, j = col[valid], first[valid], second[valid]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stock = prices[j, rows] / prices[i, rows] - 1
+            market = bench[j] / bench[i] - 1
+        result[valid, w] = stock - market
+    return result
+
+
+def summarize(returns: np.ndarray, groups: np.ndarray, windows: List[str]) -> Dict[str, Dict]:
+    """Mean/median abnormal return (in %), t-stat, hit rate and count per group and window"""
+    frame = pd.DataFrame(returns * 100, columns=windows)
+    frame['group'] = groups
+    grouped = frame.groupby('group')
+    mean, median, std = grouped.mean(), grouped.median(), grouped.std()
+    count = grouped.count()
+    positive = frame[windows].gt(0).where(frame[windows].notna()).groupby(frame['group']).mean()
+
+    report = {}
+    for group in mean.index:
+        report[str(group)] = {
+            window: {
+                'count': int(count.at[group, window]),
+                'mean': _rounded(mean.at[group, window], 4),
+                'median': _rounded(median.at[group, window], 4),
+                't_stat': _rounded(mean.at[group, window] / std.at[group, window] * np.sqrt(count.at[group, window]), 2)
+                if count.at[group, window] > 1 and std.at[group, window] > 0 else None,
+                'hit_rate': _rounded(positive.at[group, window], 3)
+            }
+            for window in windows
+        }
+    return report
+
+
+def _rounded(value, digits: int) -> Optional[float]:
+    return round(float(value), digits) if pd.notna(value) else None
+
+
+class EventStudy:
+    """How prices reacted to archived news, by catalyst type and sentiment bucket"""
+
+    def __init__(self, benchmark: str = 'SPY', interval: str = '5m', period: str = '60d', chunk_size: int = 200):
+        self.benchmark = benchmark
+        self.interval = interval
+        self.period = period
+        self.chunk_size = chunk_size
+
+    def download_closes(self, symbols: List[str]) -> pd.DataFrame:
+        """Regular-session close prices (bar x symbol) for the symbols and the benchmark, in chunks"""
+        symbols = list(dict.fromkeys([self.benchmark] + list(symbols)))
+        frames = []
+
+        for start in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[start:start + self.chunk_size]
+            try:
+                bars = yf.download(
+                    chunk,
+                    period=self.period,
+                    interval=self.interval,
+                    group_by='column',
+                    auto_adjust=True,
+                    threads=True,
+                    progress=False
+                )
+                if bars.empty:
+                    continue
+                closes = bars['Close']
+                if isinstance(closes, pd.Series):
+                    closes = closes.to_frame(chunk[0])
+                frames.append(closes)
+
+            except Exception as e:
+                print(f"Error downloading bars for chunk starting at {chunk[0]}: {e}")
+                continue
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).sort_index()
+
+    def run(self, events: pd.DataFrame, closes: Optional[pd.DataFrame] = None,
+            windows: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict:
+        """Abnormal returns for `events` (columns published_ts, symbol, sentiment_score, catalysts).
+
+        `catalysts` holds space-separated types; an event counts once under
+        each of its types, or under NONE. Prices are downloaded when `closes`
+        is not given; windows are in bars of `interval`.
+        """
+        windows = windows or DEFAULT_WINDOWS
+        names = list(windows)
+        if events.empty:
+            return {'events': 0, 'measured': 0, 'windows': windows, 'by_catalyst': {}, 'by_sentiment': {}}
+
+        if closes is None:
+            closes = self.download_closes(sorted(events['symbol'].unique()))
+        if closes.empty or self.benchmark not in closes.columns:
+            raise ValueError(f"no {self.interval} bars for the benchmark {self.benchmark}")
+
+        returns = compute_abnormal_returns(closes, closes[self.benchmark], events['published_ts'].to_numpy(),
+                                           events['symbol'].to_numpy(), windows)
+        measured = ~np.isnan(returns).all(axis=1)
+
+        buckets = sentiment_bucket(events['sentiment_score'].fillna(0).to_numpy())
+        catalysts = events['catalysts'].fillna('').str.split()
+        lengths = catalysts.str.len().to_numpy()
+        flat = np.array([c for types in catalysts for c in types], dtype=object)
+        untagged = lengths == 0
+        catalyst_rows = np.concatenate([np.repeat(np.arange(len(events)), lengths), np.flatnonzero(untagged)])
+        catalyst_labels = np.concatenate([flat, np.full(untagged.sum(), 'NONE', dtype=object)])
+
+        return {
+            'events': int(len(events)),
+            'measured': int(measured.sum()),
+            'windows': windows,
+            'interval': self.interval,
+            'benchmark': self.benchmark,
+            'by_catalyst': summarize(returns[catalyst_rows], catalyst_labels, names),
+            'by_sentiment': summarize(returns, buckets, names)
+        }
@@ -0,0 +1,133 @@
+import time
+import heapq
+import random
+import threading
+from typing import Dict, List, Optional
+
+
+class _Source:
+    __slots__ = ('url', 'interval', 'rate', 'last_polled', 'next_due', 'failures', 'in_flight', 'polls', 'new_items')
+
+    def __init__(self, url: str, interval: float):
+        self.url = url
+        self.interval = interval
+        self.rate = 0.0
+        self.last_polled: Optional[float] = None
+        self.next_due = 0.0
+        self.failures = 0
+        self.in_flight = False
+        self.polls = 0
+        self.new_items = 0
+
+
+class FeedScheduler:
+    """Per-source polling intervals that follow each feed's publishing rate.
+
+    After each poll a source's rate (new items per second) is updated as an
+    exponentially weighted average, and the next interval is set so that
+    about `target_new_per_poll` items are expected, clamped to
+    [min_interval, max_interval]. A poll with nothing new stretches the
+    interval by `idle_backoff`; failures back off exponentially. Due times
+    are jittered so sources that were added together drift apart, and no
+    more than `max_concurrency` polls are handed out at once.
+    """
+
+    def __init__(self, min_interval: float = 30, max_interval: float = 1800, initial_interval: float = 300,
+                 target_new_per_poll: float = 1.0, idle_backoff: float = 1.5, smoothing: float = 0.3,
+                 jitter: float = 0.2, max_concurrency: int = 8):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.target_new_per_poll = target_new_per_poll
+        self.idle_backoff = idle_backoff
+        self.smoothing = smoothing
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self._sources: Dict[str, _Source] = {}
+        self._heap: List[tuple] = []
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def __len__(self):
+        return len(self._sources)
+
+    def add_source(self, url: str, now: Optional[float] = None):
+        """Track a source; its first poll is spread over the next minute"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if url in self._sources:
+                return
+            source = self._sources[url] = _Source(url, self.initial_interval)
+            source.next_due = now + self._random.uniform(0, min(self.initial_interval, 60))
+            heapq.heappush(self._heap, (source.next_due, url))
+
+    def remove_source(self, url: str):
+        with self._lock:
+            self._sources.pop(url, None)
+
+    def take_due(self, now: Optional[float] = None) -> List[str]:
+        """Sources due for a poll, up to the free concurrency; they count as in flight until completed"""
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and self._in_flight < self.max_concurrency:
+                next_due, url = heapq.heappop(self._heap)
+                source = self._sources.get(url)
+                # Skip removed sources and stale heap entries left by rescheduling
+                if source is None or source.in_flight or source.next_due != next_due:
+                    continue
+                source.in_flight = True
+                self._in_flight += 1
+                due.append(url)
+        return due
+
+    def complete(self, url: str, new_items: int, success: bool = True, now: Optional[float] = None):
+        """Record a finished poll and schedule the next one"""
+        now = time.time() if now is None else now
+        with self._lock:
+            source = self._sources.get(url)
+            if source is None:
+                self._in_flight = max(self._in_flight - 1, 0)
+                return
+            if source.in_flight:
+                source.in_flight = False
+                self._in_flight = max(self._in_flight - 1, 0)
+
+            if not success:
+                source.failures += 1
+                interval = min(self.initial_interval * 2 ** source.failures, self.max_interval)
+                interval = max(interval, source.interval)
+            else:
+                source.failures = 0
+                source.polls += 1
+                source.new_items += new_items
+                if source.last_polled is None:
+                    # The first poll returns the feed's backlog, not its rate
+                    interval = source.interval
+                else:
+                    elapsed = max(now - source.last_polled, 1.0)
+                    source.rate += self.smoothing * (new_items / elapsed - source.rate)
+                    if new_items == 0:
+                        interval = source.interval * self.idle_backoff
+                    else:
+                        interval = self.target_new_per_poll / max(source.rate, 1e-9)
+                source.last_polled = now
+
+            source.interval = min(max(interval, self.min_interval), self.max_interval)
+            source.next_due = now + source.interval * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            heapq.heappush(self._heap, (source.next_due, url))
+
+    def snapshot(self, now: Optional[float] = None) -> List[Dict]:
+        now = time.time() if now is None else now
+        with self._lock:
+            return [{
+                'url': s.url,
+                'interval_seconds': round(s.interval, 1),
+                'items_per_hour': round(s.rate * 3600, 2),
+                'next_poll_in': round(max(s.next_due - now, 0), 1),
+                'failures': s.failures,
+                'polls': s.polls,
+                'new_items': s.new_items,
+                'in_flight': s.in_flight
+            } for s in self._sources.values()]
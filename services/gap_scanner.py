@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# US equity session boundaries in minutes after midnight, exchange time
+MARKET_TZ = 'America/New_York'
+REGULAR_OPEN_MINUTE = 9 * 60 + 30
+REGULAR_CLOSE_MINUTE = 16 * 60
+
+
+def compute_gap_metrics(bars: pd.DataFrame) -> pd.DataFrame:
+    """Compute gap and extended-hours statistics for every symbol at once.
+
+    `bars` is a yf.download frame with (field, symbol) columns and
+    extended-hours intraday rows. Every statistic is a masked column
+    reduction over the whole (time x symbol) block, so cost does not grow
+    with a per-symbol Python loop.
+    """
+    if bars is None or bars.empty:
+        return pd.DataFrame()
+
+    index = bars.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    index = index.tz_convert(MARKET_TZ)
+
+    dates = index.normalize()
+    minutes = index.hour * 60 + index.minute
+    regular = (minutes >= REGULAR_OPEN_MINUTE) & (minutes < REGULAR_CLOSE_MINUTE)
+    session = dates.max()
+    today = dates == session
+    prior = dates < session
+    prior_session = dates[prior].max() if prior.any() else None
+
+    close = bars['Close']
+    high = bars['High']
+    low = bars['Low']
+    volume = bars['Volume'].fillna(0)
+
+    # Previous regular-session close, then anything traded after it
+    previous_close = close[prior & regular].ffill().iloc[-1] if (prior & regular).any() else close.iloc[0] * np.nan
+    post = prior & (dates == prior_session) & (minutes >= REGULAR_CLOSE_MINUTE)
+    pre = today & (minutes < REGULAR_OPEN_MINUTE)
+
+    last_price = close[today].ffill().iloc[-1] if today.any() else previous_close
+    pre_block_close = close[pre]
+
+    metrics = pd.DataFrame({
+        'previous_close': previous_close,
+        'last_price': last_price,
+        'pre_market_price': pre_block_close.ffill().iloc[-1] if pre.any() else np.nan,
+        'pre_market_high': high[pre].max() if pre.any() else np.nan,
+        'pre_market_low': low[pre].min() if pre.any() else np.nan,
+        'pre_market_volume': volume[pre].sum() if pre.any() else 0,
+        'post_market_price': close[post].ffill().iloc[-1] if post.any() else np.nan,
+        'post_market_volume': volume[post].sum() if post.any() else 0
+    })
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        metrics['gap_percent'] = (metrics['last_price'] - metrics['previous_close']) / metrics['previous_close'] * 100
+        metrics['pre_market_range_percent'] = (
+            (metrics['pre_market_high'] - metrics['pre_market_low']) / metrics['previous_close'] * 100
+        )
+
+    metrics.index.name = 'symbol'
+    metrics['session_date'] = session.date().isoformat()
+    return metrics.dropna(subset=['previous_close', 'last_price'])
+
+
+class GapScanner:
+    """Pre/post-market gap scanner over bulk extended-hours bars"""
+
+    def __init__(self, interval: str = '5m', period: str = '5d', chunk_size: int = 250):
+        self.interval = interval
+        self.period = period
+        self.chunk_size = chunk_size
+
+    def download_bars(self, symbols: List[str]) -> pd.DataFrame:
+        """Download extended-hours intraday bars for the whole universe in chunks"""
+        frames = []
+
+        for start in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[start:start + self.chunk_size]
+            try:
+                bars = yf.download(
+                    chunk,
+                    period=self.period,
+                    interval=self.interval,
+                    prepost=True,
+                    group_by='column',
+                    auto_adjust=False,
+                    threads=True,
+                    progress=False
+                )
+                if bars.empty:
+                    continue
+                if not isinstance(bars.columns, pd.MultiIndex):
+                    bars.columns = pd.MultiIndex.from_product([bars.columns, chunk])
+                frames.append(bars)
+
+            except Exception as e:
+                print(f"Error downloading bars for chunk starting at {chunk[0]}: {e}")
+                continue
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).sort_index()
+
+    def scan(self, symbols: List[str], min_gap_percent: float = 2.0,
+             min_pre_market_volume: int = 0) -> pd.DataFrame:
+        """Gap metrics for every symbol passing the filters, largest gaps first"""
+        metrics = compute_gap_metrics(self.download_bars(symbols))
+        if metrics.empty:
+            return metrics
+
+        mask = (metrics['gap_percent'].abs() >= min_gap_percent) & (metrics['pre_market_volume'] >= min_pre_market_volume)
+        result = metrics[mask]
+        return result.reindex(result['gap_percent'].abs().sort_values(ascending=False).index)
+
+    def get_gappers(self, symbols: List[str], min_gap_percent: float = 2.0,
+                    min_pre_market_volume: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Gap scan results as JSON-ready records"""
+        try:
+            result = self.scan(symbols, min_gap_percent, min_pre_market_volume)
+            if limit:
+                result = result.head(limit)
+
+            scan_time = datetime.now().isoformat()
+            records = []
+            for symbol, row in result.iterrows():
+                records.append({
+                    'symbol': symbol,
+                    'pre_market_price': _to_float(row['pre_market_price'], row['last_price']),
+                    'last_price': float(row['last_price']),
+                    'previous_close': float(row['previous_close']),
+                    'gap_percent': float(row['gap_percent']),
+                    'pre_market_high': _to_float(row['pre_market_high']),
+                    'pre_market_low': _to_float(row['pre_market_low']),
+                    'pre_market_range_percent': _to_float(row['pre_market_range_percent']),
+                    'volume': int(row['pre_market_volume']),
+                    'post_market_price': _to_float(row['post_market_price']),
+                    'post_market_volume': int(row['post_market_volume']),
+                    'session_date': row['session_date'],
+                    'scan_time': scan_time
+                })
+            return records
+
+        except Exception as e:
+            print(f"Gap scan error: {e}")
+            return []
+
+
+def _to_float(value, default=None) -> Optional[float]:
+    if pd.isna(value):
+        return None if default is None else float(default)
+    return float(value)
@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over whole words and phrases.
+
+    Built once from {term: payload}; `find` scans text in one pass over its
+    characters regardless of how many terms there are. A hit only counts when
+    it starts and ends on a word boundary, so 'up' matches "shares up 5%" but
+    not "update" or "supply". Matching is case-insensitive.
+    """
+
+    def __init__(self, terms: Dict[str, Any]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        for term, payload in terms.items():
+            self._add(term.lower().strip(), payload)
+        self._link()
+
+    def __len__(self):
+        return sum(len(out) for out in self._out)
+
+    def _add(self, term: str, payload: Any):
+        if not term:
+            return
+        node = 0
+        for char in term:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(term), payload))
+
+    def _link(self):
+        """Breadth-first failure links; each node inherits the outputs of its failure target"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, int, Any]]:
+        """(start, end, payload) for every whole-word match, in order of end position"""
+        text = (text or '').lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        length = len(text)
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < length and _is_word_char(text[end]):
+                continue
+            for size, payload in out[node]:
+                start = end - size
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    matches.append((start, end, payload))
+        return matches
+
+    def payloads(self, text: str) -> Iterable[Any]:
+        return (payload for _, _, payload in self.find(text))
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
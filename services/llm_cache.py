@@ -0,0 +1,208 @@
+import os
+import re
+import math
+import time
+import json
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Volatile fragments that should not make otherwise identical prompts miss
+_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:?\d{2}|Z)?')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and case, and mask timestamps"""
+    prompt = _TIMESTAMP_RE.sub('<ts>', prompt or '')
+    return _WHITESPACE_RE.sub(' ', prompt).strip().lower()
+
+
+def market_fingerprint(market_state: Optional[Dict], price_step_pct: float = 0.25, change_step_pct: float = 0.5) -> str:
+    """Bucket a quote so small ticks reuse the same cached answer.
+
+    Price is bucketed on a log scale (price_step_pct wide buckets, so the
+    tolerance is the same for a $5 and a $500 stock); change percent is
+    rounded to change_step_pct.
+    """
+    if not market_state:
+        return ''
+
+    parts = [str(market_state.get('symbol', '')).upper()]
+    price = market_state.get('price')
+    if price:
+        parts.append(f"p{math.floor(math.log(float(price)) / math.log1p(price_step_pct / 100))}")
+    change = market_state.get('change_percent')
+    if change is not None:
+        parts.append(f"c{round(float(change) / change_step_pct)}")
+    return '|'.join(parts)
+
+
+class LLMResponseCache:
+    """TTL + LRU cache for model responses with optional SQLite persistence.
+
+    With a path set, entries are written through to SQLite and memory misses
+    read through to it, so every worker process pointed at the same file
+    shares replies. Every `prune_every` writes the table drops rows expired
+    for longer than `stale_grace` (until then get_stale can still serve them)
+    and is capped at `max_rows`, oldest first.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1000, path: Optional[str] = None,
+                 max_rows: int = 20000, stale_grace: float = 3600, prune_every: int = 200):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.max_rows = max_rows
+        self.stale_grace = stale_grace
+        self.prune_every = prune_every
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            try:
+                with self._connection() as conn:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS llm_responses '
+                        '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)'
+                    )
+                    conn.execute('CREATE INDEX IF NOT EXISTS llm_responses_expires ON llm_responses (expires)')
+            except Exception as e:
+                print(f"LLM cache setup error: {e}")
+            self._load()
+
+    def make_key(self, prompt: str, model: str, market_state: Optional[Dict] = None, **params) -> str:
+        """Stable key over normalized prompt, model, call parameters and market state bucket"""
+        payload = json.dumps({
+            'prompt': normalize_prompt(prompt),
+            'model': model,
+            'params': params,
+            'market': market_fingerprint(market_state)
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            # Expired entries stay until LRU-evicted so get_stale can still serve them
+            if entry is not None and entry[1] >= time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        # Read through to disk so replies fetched by other worker processes are reused
+        entry = self._lookup(key) if self.path else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.hits += 1
+            return entry[0]
+
+    def get_stale(self, key: str) -> Optional[str]:
+        """Last known reply for key even if expired; a degraded answer under backpressure"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.path:
+            entry = self._lookup(key, include_expired=True)
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        if value is None:
+            return
+        expires = time.time() + (ttl if ttl is not None else self.ttl)
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        if self.path:
+            self._persist(key, value, expires)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            try:
+                with self._connection() as conn:
+                    conn.execute('DELETE FROM llm_responses')
+            except Exception as e:
+                print(f"LLM cache clear error: {e}")
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _persist(self, key: str, value: str, expires: float):
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        try:
+            with self._connection() as conn:
+                conn.execute('INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?)', (key, value, expires))
+                if prune:
+                    self._prune(conn)
+        except Exception as e:
+            print(f"LLM cache persist error: {e}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Drop rows past the stale grace period, then the oldest beyond max_rows"""
+        conn.execute('DELETE FROM llm_responses WHERE expires < ?', (time.time() - self.stale_grace,))
+        conn.execute(
+            'DELETE FROM llm_responses WHERE expires <= '
+            '(SELECT expires FROM llm_responses ORDER BY expires DESC LIMIT 1 OFFSET ?)',
+            (self.max_rows,)
+        )
+
+    def _lookup(self, key: str, include_expired: bool = False) -> Optional[tuple]:
+        try:
+            return self._connection().execute(
+                'SELECT value, expires FROM llm_responses WHERE key = ? AND expires >= ?',
+                (key, 0 if include_expired else time.time())
+            ).fetchone()
+        except Exception as e:
+            print(f"LLM cache lookup error: {e}")
+            return None
+
+    def _load(self):
+        """Load entries, newest last, after pruning the table"""
+        try:
+            with self._connection() as conn:
+                self._prune(conn)
+                rows = conn.execute(
+                    'SELECT key, value, expires FROM llm_responses ORDER BY expires DESC LIMIT ?',
+                    (self.max_entries,)
+                ).fetchall()
+            with self._lock:
+                for key, value, expires in reversed(rows):
+                    self._entries[key] = (value, expires)
+        except Exception as e:
+            print(f"LLM cache load error: {e}")
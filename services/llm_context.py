@@ -0,0 +1,197 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to an estimate
+    tiktoken = None
+
+_ROUGH_TOKEN_RE = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+_URL_HOST_RE = re.compile(r'https?://(?:www\.)?([^/]+)')
+
+# Lower number is kept longer when the block is over budget
+PRIORITY_QUOTE = 0
+PRIORITY_INDICATORS = 1
+PRIORITY_OPTIONS = 2
+PRIORITY_NEWS = 3
+
+
+class TokenCounter:
+    """Token counts from the model's tokenizer when tiktoken is installed, else an estimate.
+
+    Counts are exact only with tiktoken (listed in requirements.txt). Without it
+    they are estimated by splitting on letter runs, 1-3 digit groups and
+    punctuation, roughly what BPE vocabularies do for this kind of text; the
+    estimate errs slightly high, so budgets stay conservative. `exact` says
+    which one is in use.
+    """
+
+    def __init__(self, model: str = 'gpt-3.5-turbo'):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding('cl100k_base')
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return len(_ROUGH_TOKEN_RE.findall(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of text within max_tokens"""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        pieces = list(_ROUGH_TOKEN_RE.finditer(text))
+        return text[:pieces[max_tokens].start()].rstrip() if max_tokens < len(pieces) else text
+
+
+def compact_number(value) -> str:
+    """12345678 -> 12.3M, 190.1234 -> 190.12, 0.4567 -> 0.457"""
+    if value is None:
+        return ''
+    value = float(value)
+    magnitude = abs(value)
+    for threshold, divisor, suffix in ((1e12, 1e12, 'T'), (1e9, 1e9, 'B'), (1e6, 1e6, 'M'), (1e4, 1e3, 'K')):
+        if magnitude >= threshold:
+            return f"{value / divisor:.3g}{suffix}"
+    if magnitude >= 1:
+        return f"{value:.2f}".rstrip('0').rstrip('.')
+    return f"{value:.3g}"
+
+
+def format_quote(quote: Dict) -> str:
+    fields = []
+    if quote.get('price'):
+        fields.append(f"px {compact_number(quote['price'])}")
+    if quote.get('change_percent') is not None:
+        fields.append(f"chg {quote['change_percent']:+.1f}%")
+    if quote.get('high') and quote.get('low'):
+        fields.append(f"rng {compact_number(quote['low'])}-{compact_number(quote['high'])}")
+    volume = quote.get('day_volume') or quote.get('volume')
+    if volume:
+        fields.append(f"vol {compact_number(volume)}")
+    rvol = quote.get('rvol') or quote.get('volume_ratio')
+    if rvol:
+        fields.append(f"rvol {rvol:.1f}")
+    if quote.get('market_cap'):
+        fields.append(f"mcap {compact_number(quote['market_cap'])}")
+    if quote.get('pe_ratio'):
+        fields.append(f"pe {quote['pe_ratio']:.0f}")
+    return ' '.join(fields)
+
+
+def format_indicators(analysis: Dict) -> str:
+    names = (('strategy', 'sig'), ('signal_strength', 'str'), ('sma_5', 'sma5'), ('sma_10', 'sma10'),
+             ('target_price', 'tgt'), ('stop_loss', 'stop'))
+    fields = []
+    for key, label in names:
+        value = analysis.get(key)
+        if value in (None, ''):
+            continue
+        fields.append(f"{label} {value if isinstance(value, str) else compact_number(value)}")
+    return ' '.join(fields)
+
+
+def format_options(options: Dict) -> str:
+    """ATM IV and put/call volume and open-interest ratios from a chain analytics dict"""
+    fields = []
+    if options.get('atm_iv'):
+        fields.append(f"iv {options['atm_iv'] * 100:.0f}%")
+
+    contracts = options.get('contracts') or []
+    totals = {}
+    for contract in contracts:
+        kind = str(contract.get('option_type', '')).lower()
+        for key in ('volume', 'openInterest'):
+            totals[(kind, key)] = totals.get((kind, key), 0) + (contract.get(key) or 0)
+    for key, label in (('volume', 'pc_vol'), ('openInterest', 'pc_oi')):
+        calls = totals.get(('call', key), 0)
+        if calls:
+            fields.append(f"{label} {totals.get(('put', key), 0) / calls:.2f}")
+
+    if options.get('expiration'):
+        fields.append(f"exp {options['expiration']}")
+    return ' '.join(fields)
+
+
+def format_news(item: Dict, max_title_chars: int = 100) -> str:
+    title = (item.get('title') or '').strip()
+    if len(title) > max_title_chars:
+        title = title[:max_title_chars].rsplit(' ', 1)[0] + '...'
+    sentiment = item.get('sentiment')
+    if isinstance(sentiment, dict):
+        sentiment = sentiment.get('sentiment')
+    mark = {'positive': '+', 'negative': '-'}.get(sentiment, '=')
+    host = _URL_HOST_RE.match(item.get('source') or '')
+    return f"[{mark}] {title}" + (f" ({host.group(1)})" if host else '')
+
+
+class ContextBuilder:
+    """Compact per-symbol feature blocks for prompts, held to a token budget.
+
+    Sections are kept in priority order: quote, indicators, options, then
+    news headlines. When a block is over budget the least important section
+    is dropped first (headlines one at a time, newest kept); the quote line
+    itself is only ever cut short, never dropped.
+    """
+
+    def __init__(self, budget: int = 250, model: str = 'gpt-3.5-turbo'):
+        self.budget = budget
+        self.counter = TokenCounter(model)
+
+    def count(self, text: str) -> int:
+        return self.counter.count(text)
+
+    def fit(self, sections: List[Tuple[int, str]], budget: Optional[int] = None,
+            separator: str = '\n') -> Tuple[str, int]:
+        """Join (priority, line) sections within budget; returns (text, tokens)"""
+        budget = budget if budget is not None else self.budget
+        kept = [(priority, order, line) for order, (priority, line) in enumerate(sections) if line]
+        costs = {order: self.count(line) + self.count(separator) for _, order, line in kept}
+        total = sum(costs.values())
+
+        # Drop from the least important, latest section backwards
+        for priority, order, _ in sorted(kept, key=lambda s: (s[0], s[1]), reverse=True):
+            if total <= budget or priority == PRIORITY_QUOTE:
+                break
+            total -= costs.pop(order)
+        text = separator.join(line for _, order, line in kept if order in costs)
+
+        if self.count(text) > budget:
+            text = self.counter.truncate(text, budget)
+        return text, self.count(text)
+
+    def symbol_block(self, symbol: str, quote: Optional[Dict] = None, indicators: Optional[Dict] = None,
+                     options: Optional[Dict] = None, news: Optional[List[Dict]] = None,
+                     budget: Optional[int] = None, separator: str = '\n') -> str:
+        """Feature block for one symbol.
+
+        Indicators, options and news default to the quote's 'analysis',
+        'options' and 'news' entries, so scanner rows can be passed as they are.
+        With separator=' | ' the block is a single line, as batch prompts need.
+        """
+        quote = quote or {}
+        indicators = indicators if indicators is not None else quote.get('analysis')
+        options = options if options is not None else quote.get('options')
+        news = news if news is not None else quote.get('news')
+
+        sections = [(PRIORITY_QUOTE, f"{symbol.upper()} {format_quote(quote)}".strip())]
+        if indicators:
+            sections.append((PRIORITY_INDICATORS, format_indicators(indicators)))
+        if options:
+            sections.append((PRIORITY_OPTIONS, format_options(options)))
+        for item in news or []:
+            sections.append((PRIORITY_NEWS, format_news(item)))
+
+        text, _ = self.fit(sections, budget, separator)
+        return text
@@ -0,0 +1,170 @@
+import os
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_ARIA = 1
+PRIORITY_BATCH = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_ARIA: 'aria',
+    PRIORITY_BATCH: 'batch'
+}
+
+
+class _Waiter:
+    __slots__ = ('priority', 'granted', 'cancelled', 'event')
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.granted = False
+        self.cancelled = False
+        self.event = threading.Event()
+
+
+class _ProviderState:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters = []
+        self.queued = {p: 0 for p in PRIORITY_NAMES}
+        self.admitted = {p: 0 for p in PRIORITY_NAMES}
+        self.rejected = {p: 0 for p in PRIORITY_NAMES}
+        self.wait_ms = {p: 0.0 for p in PRIORITY_NAMES}
+
+
+class ConcurrencyGovernor:
+    """Per-provider concurrency limit with priority queues and bounded waiting.
+
+    Callers ask for a slot at a priority. Free slots go to the most urgent
+    waiter first, and `reserved_interactive` slots are only ever given to
+    interactive calls, so background work cannot crowd out a user. A caller
+    is turned away immediately when its priority's queue is full, or after
+    its maximum wait, and is expected to serve a cached or degraded answer.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 4,
+                 reserved_interactive: int = 1,
+                 max_queue_depth: Optional[Dict[int, int]] = None,
+                 max_wait: Optional[Dict[int, float]] = None):
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.reserved_interactive = reserved_interactive
+        self.max_queue_depth = max_queue_depth or {PRIORITY_INTERACTIVE: 50, PRIORITY_ARIA: 20, PRIORITY_BATCH: 10}
+        self.max_wait = max_wait or {PRIORITY_INTERACTIVE: 10.0, PRIORITY_ARIA: 20.0, PRIORITY_BATCH: 30.0}
+        self._states: Dict[str, _ProviderState] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def _state(self, provider: str) -> _ProviderState:
+        state = self._states.get(provider)
+        if state is None:
+            state = self._states[provider] = _ProviderState(self.limits.get(provider, self.default_limit))
+        return state
+
+    def _capacity(self, state: _ProviderState, priority: int) -> int:
+        if priority == PRIORITY_INTERACTIVE:
+            return state.limit
+        return max(state.limit - self.reserved_interactive, 1)
+
+    def acquire(self, provider: str, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """Take a slot, waiting behind more urgent callers; False means back off"""
+        timeout = self.max_wait.get(priority, 10.0) if timeout is None else timeout
+        started = time.time()
+
+        with self._lock:
+            state = self._state(provider)
+            ahead = any(w[0] <= priority for w in state.waiters)
+            if not ahead and state.in_flight < self._capacity(state, priority):
+                state.in_flight += 1
+                state.admitted[priority] += 1
+                return True
+            if state.queued[priority] >= self.max_queue_depth.get(priority, 10):
+                state.rejected[priority] += 1
+                return False
+
+            waiter = _Waiter(priority)
+            heapq.heappush(state.waiters, (priority, next(self._sequence), waiter))
+            state.queued[priority] += 1
+
+        waiter.event.wait(timeout)
+
+        with self._lock:
+            state.wait_ms[priority] += (time.time() - started) * 1000
+            if waiter.granted:
+                state.admitted[priority] += 1
+                return True
+            waiter.cancelled = True
+            state.queued[priority] -= 1
+            state.rejected[priority] += 1
+            return False
+
+    def release(self, provider: str):
+        with self._lock:
+            state = self._state(provider)
+            state.in_flight = max(state.in_flight - 1, 0)
+            self._dispatch(state)
+
+    def _dispatch(self, state: _ProviderState):
+        """Hand freed slots to queued callers, most urgent first"""
+        while state.waiters:
+            priority, _, waiter = state.waiters[0]
+            if waiter.cancelled:
+                heapq.heappop(state.waiters)
+                continue
+            if state.in_flight >= self._capacity(state, priority):
+                break
+            heapq.heappop(state.waiters)
+            state.queued[priority] -= 1
+            state.in_flight += 1
+            waiter.granted = True
+            waiter.event.set()
+
+    @contextmanager
+    def slot(self, provider: str, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = None):
+        """Context manager yielding whether a slot was granted; released on exit if it was"""
+        granted = self.acquire(provider, priority, timeout)
+        try:
+            yield granted
+        finally:
+            if granted:
+                self.release(provider)
+
+    def metrics(self, provider: str) -> Dict:
+        with self._lock:
+            state = self._state(provider)
+            return {
+                'limit': state.limit,
+                'in_flight': state.in_flight,
+                'queue_depth': {PRIORITY_NAMES[p]: n for p, n in state.queued.items()},
+                'admitted': {PRIORITY_NAMES[p]: n for p, n in state.admitted.items()},
+                'rejected': {PRIORITY_NAMES[p]: n for p, n in state.rejected.items()},
+                'avg_wait_ms': {
+                    PRIORITY_NAMES[p]: round(state.wait_ms[p] / max(state.admitted[p] + state.rejected[p], 1), 1)
+                    for p in PRIORITY_NAMES
+                }
+            }
+
+
+_shared_governor = None
+_shared_lock = threading.Lock()
+
+
+def shared_governor() -> ConcurrencyGovernor:
+    """Process-wide governor, so every OpenAIService instance shares one quota per provider"""
+    global _shared_governor
+    with _shared_lock:
+        if _shared_governor is None:
+            _shared_governor = ConcurrencyGovernor(
+                limits={
+                    'anthropic': int(os.getenv('ANTHROPIC_MAX_CONCURRENCY', 4)),
+                    'openai': int(os.getenv('OPENAI_MAX_CONCURRENCY', 4))
+                }
+            )
+        return _shared_governor
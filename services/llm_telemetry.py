@@ -0,0 +1,187 @@
+import time
+import threading
+import numpy as np
+from collections import deque
+from datetime import date
+from typing import Dict, List, Optional
+
+
+class ProviderTelemetry:
+    """Per-provider call statistics over a rolling time window.
+
+    Rate and latency figures come from the last `window_seconds` of calls;
+    request, token and cost totals are also kept per calendar day for the
+    status page.
+    """
+
+    def __init__(self, window_seconds: float = 3600, max_samples: int = 5000):
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self._samples: Dict[str, deque] = {}
+        self._daily: Dict[str, Dict] = {}
+        self._last_error: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, latency_ms: float, success: bool,
+               input_tokens: int = 0, output_tokens: int = 0, cost: float = 0.0,
+               error: Optional[str] = None):
+        now = time.time()
+        with self._lock:
+            samples = self._samples.setdefault(provider, deque(maxlen=self.max_samples))
+            samples.append((now, latency_ms, success, input_tokens + output_tokens, cost))
+
+            today = date.today().isoformat()
+            daily = self._daily.get(provider)
+            if daily is None or daily['date'] != today:
+                daily = self._daily[provider] = {'date': today, 'requests': 0, 'tokens': 0, 'cost': 0.0}
+            daily['requests'] += 1
+            daily['tokens'] += input_tokens + output_tokens
+            daily['cost'] += cost
+
+            if error:
+                self._last_error[provider] = error
+
+    def _window(self, provider: str) -> List[tuple]:
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            samples = self._samples.get(provider)
+            if not samples:
+                return []
+            while samples and samples[0][0] < cutoff:
+                samples.popleft()
+            return list(samples)
+
+    def latency_percentile(self, provider: str, percentile: float) -> Optional[float]:
+        """Latency percentile in ms over successful calls in the window"""
+        latencies = [s[1] for s in self._window(provider) if s[2]]
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, percentile))
+
+    def snapshot(self, provider: str) -> Dict:
+        window = self._window(provider)
+        latencies = np.array([s[1] for s in window if s[2]])
+        successes = sum(1 for s in window if s[2])
+        with self._lock:
+            daily = dict(self._daily.get(provider) or {})
+            last_error = self._last_error.get(provider)
+        if daily.get('date') != date.today().isoformat():
+            daily = {'requests': 0, 'tokens': 0, 'cost': 0.0}
+
+        return {
+            'requests': len(window),
+            'successes': successes,
+            'success_rate': round(successes / len(window) * 100, 1) if window else None,
+            'p50_ms': round(float(np.percentile(latencies, 50)), 1) if latencies.size else None,
+            'p90_ms': round(float(np.percentile(latencies, 90)), 1) if latencies.size else None,
+            'p95_ms': round(float(np.percentile(latencies, 95)), 1) if latencies.size else None,
+            'tokens': int(sum(s[3] for s in window)),
+            'cost': round(sum(s[4] for s in window), 6),
+            'requests_today': daily['requests'],
+            'tokens_today': daily['tokens'],
+            'cost_today': round(daily['cost'], 6),
+            'last_error': last_error
+        }
+
+
+class LLMRouter:
+    """Orders providers for a call by observed latency, cost or a blend of both"""
+
+    OBJECTIVES = ('latency', 'cost', 'balanced')
+
+    def __init__(self, telemetry: ProviderTelemetry, providers: Dict[str, Dict],
+                 objective: str = 'latency', min_samples: int = 5, min_success_rate: float = 50.0):
+        """`providers` maps name to a spec with 'input_cost'/'output_cost' (USD per 1M tokens)
+        and 'expected_latency_ms', the prior used until enough calls have been observed."""
+        self.telemetry = telemetry
+        self.providers = providers
+        self.objective = objective if objective in self.OBJECTIVES else 'latency'
+        self.min_samples = min_samples
+        self.min_success_rate = min_success_rate
+
+    def _latency(self, name: str, stats: Dict) -> float:
+        if stats['successes'] >= self.min_samples and stats['p50_ms'] is not None:
+            return stats['p50_ms']
+        return float(self.providers[name].get('expected_latency_ms', 2000))
+
+    def _cost(self, name: str) -> float:
+        spec = self.providers[name]
+        # Typical analysis call: prompt-heavy, short answer
+        return spec.get('input_cost', 0.0) * 0.75 + spec.get('output_cost', 0.0) * 0.25
+
+    def rank(self, available: Optional[List[str]] = None, objective: Optional[str] = None) -> List[str]:
+        """Providers best first; unhealthy ones (low success rate) go last"""
+        objective = objective if objective in self.OBJECTIVES else self.objective
+        names = [n for n in self.providers if available is None or n in available]
+        if not names:
+            return []
+
+        stats = {n: self.telemetry.snapshot(n) for n in names}
+        latency = {n: self._latency(n, stats[n]) for n in names}
+        cost = {n: self._cost(n) for n in names}
+        max_latency = max(latency.values()) or 1.0
+        max_cost = max(cost.values()) or 1.0
+
+        def score(name):
+            if objective == 'latency':
+                value = (latency[name], cost[name])
+            elif objective == 'cost':
+                value = (cost[name], latency[name])
+            else:
+                value = (latency[name] / max_latency + cost[name] / max_cost, 0)
+            s = stats[name]
+            unhealthy = s['requests'] >= self.min_samples and (s['success_rate'] or 0) < self.min_success_rate
+            return (unhealthy,) + value
+
+        return sorted(names, key=score)
+
+    def choose(self, available: Optional[List[str]] = None, objective: Optional[str] = None) -> Optional[str]:
+        ranked = self.rank(available, objective)
+        return ranked[0] if ranked else None
+
+
+class HedgeBudget:
+    """Caps the share of recent requests that may send a hedge (duplicate) call"""
+
+    def __init__(self, max_fraction: float = 0.1, window: int = 1000):
+        self.max_fraction = max_fraction
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_fraction > 0
+
+    def record_request(self):
+        with self._lock:
+            self._recent.append(False)
+
+    def try_hedge(self) -> bool:
+        """Count one request in the window as hedged, if that stays within max_fraction"""
+        with self._lock:
+            if not self._recent:
+                return False
+            hedged = sum(self._recent)
+            if (hedged + 1) / len(self._recent) > self.max_fraction:
+                return False
+            self._recent[-1] = True
+            self.hedges += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            window = len(self._recent)
+            hedged = sum(self._recent)
+        return {
+            'max_fraction': self.max_fraction,
+            'window_requests': window,
+            'window_hedged': hedged,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins
+        }
@@ -2,16 +2,38 @@
 import requests
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import os
+import time
+import threading
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from . import options_math
+from .options_flow import OptionsFlowDetector
+from .gap_scanner import GapScanner
+from .volume_profile import VolumeProfileStore
 
 class MarketDataService:
     def __init__(self):
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.twelve_data_key = os.getenv('TWELVE_DATA_API_KEY')
+        self.gap_scanner = GapScanner()
+        self.volume_profiles = VolumeProfileStore()
         
+        # Options flow polling
+        self.options_watchlist = ['AAPL', 'TSLA', 'NVDA', 'MSFT', 'GOOGL', 'META', 'AMZN', 'AMD', 'NFLX', 'SPY', 'QQQ']
+        self.options_flow_interval = 60  # 1 minute
+        self.options_flow_detector = OptionsFlowDetector()
+        self.latest_options_flow = []
+        self.last_options_poll = None
+        self.is_polling_options = False
+        
+    def start_volume_profiles(self, symbols: List[str]):
+        """Build RVOL profiles for the symbols and the options watchlist now, then refresh them nightly"""
+        universe = list(dict.fromkeys(list(symbols) + self.options_watchlist))
+        self.volume_profiles.start_nightly_refresh(universe)
+    
     def get_stock_data(self, symbol: str) -> Optional[Dict]:
         """Get real-time stock data"""
         try:
@@ -25,6 +47,7 @@ class MarketDataService:
             
             current_price = hist['Close'].iloc[-1]
             previous_close = info.get('previousClose', current_price)
+            day_volume = int(hist['Volume'].sum())
             
             return {
                 'symbol': symbol,
@@ -33,7 +56,9 @@ class MarketDataService:
                 'change': float(current_price - previous_close),
                 'change_percent': float((current_price - previous_close) / previous_close * 100),
                 'volume': int(hist['Volume'].iloc[-1]),
+                'day_volume': day_volume,
                 'avg_volume': int(info.get('averageVolume', 0)),
+                'rvol': self.volume_profiles.relative_volume(symbol, day_volume, hist.index[-1]),
                 'market_cap': info.get('marketCap', 0),
                 'pe_ratio': info.get('trailingPE', 0),
                 'timestamp': datetime.now().isoformat()
@@ -91,6 +116,12 @@ class MarketDataService:
             print(f"Error getting top movers: {e}")
             return []
     
+    def get_volume_ratio(self, data: Dict) -> float:
+        """Time-of-day relative volume, falling back to volume over average daily volume without a profile"""
+        if data.get('rvol') is not None:
+            return data['rvol']
+        return data.get('volume', 0) / max(data.get('avg_volume', 1), 1)
+    
     def get_volume_leaders(self) -> List[Dict]:
         """Get volume leaders"""
         try:
@@ -100,7 +131,7 @@ class MarketDataService:
             for symbol in symbols:
                 data = self.get_stock_data(symbol)
                 if data:
-                    volume_ratio = data.get('volume', 0) / max(data.get('avg_volume', 1), 1)
+                    volume_ratio = self.get_volume_ratio(data)
                     if volume_ratio > 1.5:  # 50% above average
                         data['volume_ratio'] = volume_ratio
                         leaders.append(data)
@@ -111,36 +142,11 @@ class MarketDataService:
             print(f"Error getting volume leaders: {e}")
             return []
     
-    def get_pre_market_movers(self) -> List[Dict]:
-        """Get pre-market movers (gap ups/downs)"""
+    def get_pre_market_movers(self, symbols: Optional[List[str]] = None, min_gap_percent: float = 2.0) -> List[Dict]:
+        """Get pre-market movers (gap ups/downs) from bulk extended-hours bars"""
         try:
-            symbols = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX']
-            movers = []
-            
-            for symbol in symbols:
-                try:
-                    ticker = yf.Ticker(symbol)
-                    data = ticker.history(period='2d', interval='1d')
-                    
-                    if len(data) >= 2:
-                        current_price = float(data['Close'].iloc[-1])
-                        previous_close = float(data['Close'].iloc[-2])
-                        gap_percent = (current_price - previous_close) / previous_close * 100
-                        
-                        if abs(gap_percent) > 2:  # 2%+ gap
-                            movers.append({
-                                'symbol': symbol,
-                                'pre_market_price': current_price,
-                                'previous_close': previous_close,
-                                'gap_percent': gap_percent,
-                                'volume': int(data['Volume'].iloc[-1])
-                            })
-                            
-                except Exception as e:
-                    print(f"Error getting pre-market data for {symbol}: {e}")
-                    continue
-            
-            return movers
+            symbols = symbols or ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX']
+            return self.gap_scanner.get_gappers(symbols, min_gap_percent=min_gap_percent)
             
         except Exception as e:
             print(f"Error getting pre-market movers: {e}")
@@ -180,3 +186,118 @@ class MarketDataService:
         except Exception as e:
             print(f"Error getting options data for {symbol}: {e}")
             return None
+
+    def _get_option_chain(self, symbol: str, expiration: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """Get one expiration's calls and puts as a single frame"""
+        ticker = yf.Ticker(symbol)
+        expirations = ticker.options
+        if not expirations:
+            return None
+
+        expiration = expiration or expirations[0]
+        chain = ticker.option_chain(expiration)
+
+        calls = chain.calls.assign(option_type='CALL')
+        puts = chain.puts.assign(option_type='PUT')
+        df = pd.concat([calls, puts], ignore_index=True)
+        df['expiration'] = expiration
+        return df
+
+    def _get_spot_price(self, symbol: str) -> Optional[float]:
+        """Get the latest 1-minute close"""
+        hist = yf.Ticker(symbol).history(period='1d', interval='1m')
+        if hist.empty:
+            return None
+        return float(hist['Close'].iloc[-1])
+
+    def get_option_chain_analytics(self, symbol: str, expiration: Optional[str] = None) -> Optional[Dict]:
+        """Get implied volatility and Greeks for a full option chain"""
+        try:
+            chain = self._get_option_chain(symbol, expiration)
+            if chain is None or chain.empty:
+                return None
+
+            spot = self._get_spot_price(symbol)
+            if spot is None:
+                return None
+
+            expiration = chain['expiration'].iloc[0]
+            t = options_math.year_fraction(expiration)
+            analytics = options_math.analyze_chain(chain, spot, t)
+
+            calls = analytics[analytics['option_type'] == 'CALL']
+            atm = calls.iloc[(calls['strike'] - spot).abs().argsort()[:1]] if not calls.empty else calls
+            atm_iv = float(atm['iv'].iloc[0]) if not atm.empty and pd.notna(atm['iv'].iloc[0]) else None
+
+            columns = ['contractSymbol', 'option_type', 'strike', 'mid_price', 'volume',
+                       'openInterest', 'iv', 'delta', 'gamma', 'vega', 'theta']
+            contracts = analytics[[c for c in columns if c in analytics]]
+
+            return {
+                'symbol': symbol,
+                'expiration': expiration,
+                'underlying_price': spot,
+                'time_to_expiry': t,
+                'atm_iv': atm_iv,
+                'contracts': contracts.replace({np.nan: None}).to_dict('records'),
+                'timestamp': datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            print(f"Error getting option chain analytics for {symbol}: {e}")
+            return None
+
+    def poll_options_flow(self) -> List[Dict]:
+        """Snapshot the watchlist's nearest-expiry chains and run them through the flow detector"""
+        flow = []
+
+        for symbol in self.options_watchlist:
+            try:
+                chain = self._get_option_chain(symbol)
+                if chain is None or chain.empty:
+                    continue
+
+                spot = self._get_spot_price(symbol)
+                if spot is not None:
+                    t = options_math.year_fraction(chain['expiration'].iloc[0])
+                    chain = options_math.analyze_chain(chain, spot, t)
+
+                flow.extend(self.options_flow_detector.update(symbol, chain))
+
+            except Exception as e:
+                print(f"Error polling options flow for {symbol}: {e}")
+                continue
+
+        flow.sort(key=lambda x: x.get('premium', 0), reverse=True)
+        self.latest_options_flow = flow
+        self.last_options_poll = datetime.now()
+        return flow
+
+    def start_options_flow_monitoring(self):
+        """Start polling the options watchlist every minute"""
+        def poll_loop():
+            self.is_polling_options = True
+            while self.is_polling_options:
+                try:
+                    self.poll_options_flow()
+                    time.sleep(self.options_flow_interval)
+                except Exception as e:
+                    print(f"Options flow monitoring error: {e}")
+                    time.sleep(self.options_flow_interval)
+
+        poll_thread = threading.Thread(target=poll_loop, daemon=True)
+        poll_thread.start()
+
+    def stop_options_flow_monitoring(self):
+        """Stop options flow polling"""
+        self.is_polling_options = False
+
+    def get_options_flow(self, limit: int = 50) -> List[Dict]:
+        """Options flow from the background poller, unusual activity first"""
+        try:
+            flow = sorted(self.latest_options_flow, key=lambda x: (x.get('unusual', False), x.get('premium', 0)), reverse=True)
+            return flow[:limit]
+
+        except Exception as e:
+            print(f"Error getting options flow: {e}")
+            return []
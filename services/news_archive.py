@@ -0,0 +1,210 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+from .news_index import published_iso
+
+
+def fts_query(text: str) -> str:
+    """Free text to an FTS5 query: every word must appear; a trailing * keeps prefix search"""
+    terms = []
+    for match in re.finditer(r'(\w+)(\*?)', text or ''):
+        word, star = match.groups()
+        terms.append(f'"{word}"{star}')
+    return ' '.join(terms)
+
+
+class NewsArchive:
+    """Persistent news history with a full-text index (SQLite FTS5).
+
+    Stories live in `news`, with their text in the `news_fts` FTS5 table under
+    the same rowid. Symbol and catalyst tags go in narrow
+    (tag, published_ts) tables, so filtered queries are index range scans even
+    over months of headlines. Writes are batched, one transaction per call.
+    """
+
+    def __init__(self, path: str = 'data/news_archive.db'):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS news (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                published_ts REAL NOT NULL,
+                title TEXT, summary TEXT, link TEXT, source TEXT,
+                sentiment TEXT, sentiment_score REAL,
+                symbols TEXT, catalysts TEXT
+            );
+            CREATE INDEX IF NOT EXISTS news_published ON news (published_ts);
+            CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5 (title, summary, tokenize = 'porter unicode61');
+            CREATE TABLE IF NOT EXISTS news_symbols (symbol TEXT NOT NULL, published_ts REAL NOT NULL, news_rowid INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS news_symbols_lookup ON news_symbols (symbol, published_ts);
+            CREATE TABLE IF NOT EXISTS news_catalysts (catalyst TEXT NOT NULL, published_ts REAL NOT NULL, news_rowid INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS news_catalysts_lookup ON news_catalysts (catalyst, published_ts);
+            CREATE INDEX IF NOT EXISTS news_catalysts_row ON news_catalysts (news_rowid);
+        ''')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add_many(self, items: List[Dict]) -> int:
+        """Archive items in one transaction; already archived ids are skipped. Returns rows added."""
+        if not items:
+            return 0
+        added = 0
+        with self._write_lock:
+            conn = self._connection()
+            try:
+                conn.execute('BEGIN')
+                for item in items:
+                    sentiment = item.get('sentiment') or {}
+                    cursor = conn.execute(
+                        'INSERT OR IGNORE INTO news (id, published_ts, title, summary, link, source, sentiment, '
+                        'sentiment_score, symbols, catalysts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (item['id'], item['published_ts'], item.get('title', ''), item.get('summary', ''),
+                         item.get('link', ''), item.get('source', ''), sentiment.get('sentiment'),
+                         sentiment.get('score'), ' '.join(item.get('symbols', [])),
+                         ' '.join(item.get('catalysts', [])))
+                    )
+                    if cursor.rowcount != 1:
+                        continue
+                    rowid = cursor.lastrowid
+                    conn.execute('INSERT INTO news_fts (rowid, title, summary) VALUES (?, ?, ?)',
+                                 (rowid, item.get('title', ''), item.get('summary', '')))
+                    conn.executemany('INSERT INTO news_symbols VALUES (?, ?, ?)',
+                                     [(s, item['published_ts'], rowid) for s in item.get('symbols', [])])
+                    conn.executemany('INSERT INTO news_catalysts VALUES (?, ?, ?)',
+                                     [(c, item['published_ts'], rowid) for c in item.get('catalysts', [])])
+                    added += 1
+                conn.execute('COMMIT')
+            except Exception as e:
+                conn.execute('ROLLBACK')
+                print(f"News archive write error: {e}")
+                return 0
+        return added
+
+    def rescore(self, scorer, batch_size: int = 50000) -> int:
+        """Recompute stored headline sentiment with a LexiconScorer, batch_size rows per transaction"""
+        conn = self._connection()
+        last_rowid, updated = 0, 0
+        while True:
+            rows = conn.execute('SELECT rowid, title FROM news WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                                (last_rowid, batch_size)).fetchall()
+            if not rows:
+                return updated
+            labels = scorer.labels(scorer.score([row['title'] or '' for row in rows]))
+            with self._write_lock:
+                try:
+                    conn.execute('BEGIN')
+                    conn.executemany('UPDATE news SET sentiment = ?, sentiment_score = ? WHERE rowid = ?',
+                                     [(label['sentiment'], label['score'], row['rowid'])
+                                      for row, label in zip(rows, labels)])
+                    conn.execute('COMMIT')
+                except Exception as e:
+                    conn.execute('ROLLBACK')
+                    print(f"News archive rescore error: {e}")
+                    return updated
+            updated += len(rows)
+            last_rowid = rows[-1]['rowid']
+
+    def search(self, query: Optional[str] = None, symbol: Optional[str] = None, catalyst: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None, limit: int = 50) -> List[Dict]:
+        """Newest matching stories; every filter is optional and they combine with AND.
+
+        `query` is free text (all words must match, 'earn*' for prefixes);
+        `since`/`until` are epoch seconds on the publish time. The most
+        selective filter drives the scan newest-first through its index and
+        the rest are checked per row, so the query stops after `limit` hits.
+        Pure text searches are ordered by archive (arrival) order.
+        """
+        match = fts_query(query) if query else ''
+        if symbol:
+            sql = 'SELECT n.* FROM news_symbols d JOIN news n ON n.rowid = d.news_rowid WHERE d.symbol = ?'
+            params, order = [symbol.upper()], 'd.published_ts'
+        elif catalyst:
+            sql = 'SELECT n.* FROM news_catalysts d JOIN news n ON n.rowid = d.news_rowid WHERE d.catalyst = ?'
+            params, order = [catalyst.upper()], 'd.published_ts'
+        elif match:
+            sql = 'SELECT n.* FROM news_fts d JOIN news n ON n.rowid = d.rowid WHERE news_fts MATCH ?'
+            params, order = [match], 'd.rowid'
+        else:
+            sql = 'SELECT n.* FROM news n WHERE 1'
+            params, order = [], 'n.published_ts'
+
+        # On the tag tables the range narrows the index scan itself
+        column = 'd.published_ts' if order == 'd.published_ts' else 'n.published_ts'
+        if since is not None:
+            sql += f' AND {column} >= ?'
+            params.append(since)
+        if until is not None:
+            sql += f' AND {column} <= ?'
+            params.append(until)
+        if symbol and catalyst:
+            sql += ' AND EXISTS (SELECT 1 FROM news_catalysts c WHERE c.catalyst = ? AND c.news_rowid = n.rowid)'
+            params.append(catalyst.upper())
+        if match and (symbol or catalyst):
+            if '*' in match:
+                # Prefix terms are costly to re-evaluate per row; resolve the match set once
+                sql += ' AND n.rowid IN (SELECT rowid FROM news_fts WHERE news_fts MATCH ?)'
+            else:
+                sql += ' AND EXISTS (SELECT 1 FROM news_fts f WHERE news_fts MATCH ? AND f.rowid = n.rowid)'
+            params.append(match)
+
+        sql += f' ORDER BY {order} DESC LIMIT ?'
+        params.append(int(limit))
+
+        try:
+            rows = self._connection().execute(sql, params).fetchall()
+        except Exception as e:
+            print(f"News archive search error: {e}")
+            return []
+        return [self._row_to_item(row) for row in rows]
+
+    def events(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Dict]:
+        """One row per (story, symbol) tagged in the range: published_ts, symbol, sentiment_score, catalysts"""
+        sql = ('SELECT s.published_ts, s.symbol, n.sentiment_score, n.catalysts '
+               'FROM news_symbols s JOIN news n ON n.rowid = s.news_rowid WHERE 1')
+        params = []
+        if since is not None:
+            sql += ' AND s.published_ts >= ?'
+            params.append(since)
+        if until is not None:
+            sql += ' AND s.published_ts <= ?'
+            params.append(until)
+        try:
+            return [dict(row) for row in self._connection().execute(sql + ' ORDER BY s.published_ts', params)]
+        except Exception as e:
+            print(f"News archive events error: {e}")
+            return []
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM news').fetchone()[0]
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'summary': row['summary'],
+            'link': row['link'],
+            'source': row['source'],
+            'published_at': published_iso(row['published_ts']),
+            'published_ts': row['published_ts'],
+            'sentiment': {'sentiment': row['sentiment'], 'score': row['sentiment_score']},
+            'symbols': row['symbols'].split() if row['symbols'] else [],
+            'catalysts': row['catalysts'].split() if row['catalysts'] else []
+        }
@@ -0,0 +1,129 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class Subscription:
+    """One subscriber's filters and bounded inbox.
+
+    The inbox keeps the newest `max_pending` items; a subscriber that falls
+    further behind loses the oldest ones (counted in `dropped`) rather than
+    slowing the publisher down.
+    """
+
+    def __init__(self, symbols: Optional[Iterable[str]] = None, catalysts: Optional[Iterable[str]] = None,
+                 max_pending: int = 200):
+        self.symbols: Set[str] = {s.upper() for s in symbols or ()}
+        self.catalysts: Set[str] = {c.upper() for c in catalysts or ()}
+        self.dropped = 0
+        self._pending = deque(maxlen=max_pending)
+        self._ready = threading.Condition()
+        self.closed = False
+
+    def matches(self, item: Dict) -> bool:
+        if self.symbols and self.symbols.isdisjoint(item.get('symbols', ())):
+            return False
+        if self.catalysts and self.catalysts.isdisjoint(item.get('catalysts', ())):
+            return False
+        return True
+
+    def _deliver(self, items: List[Dict]):
+        with self._ready:
+            overflow = len(self._pending) + len(items) - self._pending.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+            self._pending.extend(items)
+            self._ready.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Everything pending, waiting up to timeout for something to arrive; [] on timeout or close"""
+        with self._ready:
+            if not self._pending and not self.closed:
+                self._ready.wait(timeout)
+            items = list(self._pending)
+            self._pending.clear()
+            return items
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify_all()
+
+
+class NewsBus:
+    """In-process publish/subscribe for newly ingested news items.
+
+    Subscriptions are indexed by the symbols (or, failing that, the
+    catalysts) they filter on, so publishing a story only touches the
+    subscribers that could want it plus the unfiltered ones, however many
+    are connected. Publishing never blocks on a subscriber.
+    """
+
+    def __init__(self, max_pending: int = 200):
+        self.max_pending = max_pending
+        self._subscriptions: Set[Subscription] = set()
+        self._unfiltered: Set[Subscription] = set()
+        self._by_symbol: Dict[str, Set[Subscription]] = {}
+        self._by_catalyst: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None,
+                  catalysts: Optional[Iterable[str]] = None) -> Subscription:
+        """New subscription; with both filters an item must match a symbol and a catalyst"""
+        subscription = Subscription(symbols, catalysts, self.max_pending)
+        index, keys = self._index_for(subscription)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            for key in keys:
+                index.setdefault(key, set()).add(subscription)
+            if index is None:
+                self._unfiltered.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        index, keys = self._index_for(subscription)
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self._unfiltered.discard(subscription)
+            for key in keys:
+                subscribers = index.get(key)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del index[key]
+
+    def _index_for(self, subscription: Subscription) -> tuple:
+        """(index, keys) a subscription is filed under; (None, ()) when it has no filters"""
+        if subscription.symbols:
+            return self._by_symbol, subscription.symbols
+        if subscription.catalysts:
+            return self._by_catalyst, subscription.catalysts
+        return None, ()
+
+    def publish(self, items: List[Dict]) -> int:
+        """Deliver items to every matching subscriber, one wake-up per subscriber; returns deliveries"""
+        if not items:
+            return 0
+        batches: Dict[Subscription, List[Dict]] = {}
+        with self._lock:
+            self.published += len(items)
+            for item in items:
+                candidates = set(self._unfiltered)
+                for symbol in item.get('symbols', ()):
+                    candidates.update(self._by_symbol.get(symbol, ()))
+                for catalyst in item.get('catalysts', ()):
+                    candidates.update(self._by_catalyst.get(catalyst, ()))
+                for subscription in candidates:
+                    if subscription.matches(item):
+                        batches.setdefault(subscription, []).append(item)
+        for subscription, batch in batches.items():
+            subscription._deliver(batch)
+        return sum(len(batch) for batch in batches.values())
+
+    def stats(self) -> Dict:
+        return {'subscribers': len(self), 'published': self.published}
@@ -0,0 +1,122 @@
+import time
+import bisect
+import hashlib
+import calendar
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+
+def news_id(entry: Dict) -> str:
+    """Stable identity for a feed entry: its GUID, else a hash of its link, else of its title"""
+    guid = entry.get('id') or entry.get('guid')
+    if guid:
+        return str(guid)
+    basis = entry.get('link') or f"{entry.get('source', '')}|{entry.get('title', '')}"
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+
+def published_timestamp(entry: Dict, default: Optional[float] = None) -> float:
+    """Epoch seconds of an entry's publish (or update) time; default (now) when it has none"""
+    for key in ('published_parsed', 'updated_parsed'):
+        parsed = entry.get(key)
+        if parsed:
+            return float(calendar.timegm(parsed))
+    for key in ('published', 'updated'):
+        text = entry.get(key)
+        if text:
+            try:
+                moment = parsedate_to_datetime(text)
+                if moment.tzinfo is None:
+                    moment = moment.replace(tzinfo=timezone.utc)
+                return moment.timestamp()
+            except (TypeError, ValueError):
+                pass
+    return default if default is not None else time.time()
+
+
+class NewsIndex:
+    """Deduplicated news history ordered by publish time, newest last.
+
+    Items are keyed by news_id and kept in a list sorted on
+    (publish time, arrival); an insert is a binary search, and since new
+    stories nearly always sort last it is in practice an append. The oldest
+    items are dropped once the history exceeds max_items; after that,
+    anything published no later than the oldest kept item is refused, so an
+    evicted story re-read from a feed does not come back as new. Items carrying
+    'symbols' are also indexed by symbol, so per-symbol lookups never scan.
+    """
+
+    def __init__(self, max_items: int = 5000):
+        self.max_items = max_items
+        self._items: Dict[str, Dict] = {}
+        self._order: List[tuple] = []
+        self._by_symbol: Dict[str, Dict[str, None]] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id: str):
+        return item_id in self._items
+
+    def add(self, item: Dict) -> bool:
+        """Insert an item (with 'id' and 'published_ts'); False if it was already indexed or is too old to keep"""
+        with self._lock:
+            if item['id'] in self._items:
+                return False
+            if len(self._order) >= self.max_items and item['published_ts'] <= self._order[0][0]:
+                return False
+            self._sequence += 1
+            key = (item['published_ts'], self._sequence, item['id'])
+            if not self._order or key > self._order[-1]:
+                self._order.append(key)
+            else:
+                bisect.insort(self._order, key)
+            self._items[item['id']] = item
+            for symbol in item.get('symbols', ()):
+                self._by_symbol.setdefault(symbol, {})[item['id']] = None
+
+            excess = len(self._order) - self.max_items
+            if excess > 0:
+                for _, _, old_id in self._order[:excess]:
+                    old = self._items.pop(old_id)
+                    for symbol in old.get('symbols', ()):
+                        ids = self._by_symbol.get(symbol)
+                        if ids is not None:
+                            ids.pop(old_id, None)
+                            if not ids:
+                                del self._by_symbol[symbol]
+                del self._order[:excess]
+            return True
+
+    def add_many(self, items: List[Dict]) -> List[Dict]:
+        """Insert items, returning the ones that were new"""
+        return [item for item in items if self.add(item)]
+
+    def latest(self, limit: int = 20, since: Optional[float] = None) -> List[Dict]:
+        """Newest items first, optionally only those published at or after `since` (epoch seconds)"""
+        with self._lock:
+            start = bisect.bisect_left(self._order, (since,)) if since is not None else 0
+            start = max(start, len(self._order) - limit)
+            return [self._items[key[2]] for key in reversed(self._order[start:])]
+
+    def for_symbol(self, symbol: str, limit: int = 20) -> List[Dict]:
+        """Newest items mentioning a symbol"""
+        with self._lock:
+            items = [self._items[i] for i in self._by_symbol.get(symbol.upper(), ())]
+        items.sort(key=lambda item: item['published_ts'], reverse=True)
+        return items[:limit]
+
+    def symbol_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {symbol: len(ids) for symbol, ids in self._by_symbol.items()}
+
+    def get(self, item_id: str) -> Optional[Dict]:
+        return self._items.get(item_id)
+
+
+def published_iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
@@ -1,10 +1,44 @@
 
+import os
+import json
 import requests
 import time
+import hashlib
 import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 import feedparser
+import pandas as pd
+from .news_index import NewsIndex, news_id, published_timestamp, published_iso
+from .keyword_matcher import KeywordMatcher
+from .ticker_extractor import TickerExtractor
+from .news_archive import NewsArchive
+from .feed_scheduler import FeedScheduler
+from .sentiment_scorer import LexiconScorer, aggregate_by_symbol
+from .event_study import EventStudy
+from .news_bus import NewsBus
+
+# Whole words and phrases; extra terms can be merged in from NEWS_LEXICON_PATH (same JSON shape)
+SENTIMENT_LEXICON = {
+    'positive': ['gain', 'gains', 'rise', 'rises', 'rising', 'up', 'bullish', 'positive', 'growth', 'strong',
+                 'beat', 'beats', 'upgrade', 'upgrades', 'upgraded', 'rally', 'rallies', 'surge', 'surges',
+                 'soar', 'soars', 'jump', 'jumps', 'record high', 'raises guidance', 'outperform'],
+    'negative': ['fall', 'falls', 'drop', 'drops', 'down', 'bearish', 'negative', 'decline', 'declines', 'weak',
+                 'miss', 'misses', 'downgrade', 'downgrades', 'downgraded', 'plunge', 'plunges', 'slump',
+                 'slumps', 'tumble', 'tumbles', 'cuts guidance', 'underperform', 'recall']
+}
+CATALYST_LEXICON = {
+    'EARNINGS': ['earnings', 'quarterly results', 'eps', 'revenue guidance'],
+    'MERGER': ['merger', 'merge', 'to merge'],
+    'ACQUISITION': ['acquisition', 'acquire', 'acquires', 'buyout', 'takeover'],
+    'IPO': ['ipo', 'initial public offering'],
+    'FDA': ['fda'],
+    'APPROVAL': ['approval', 'approves', 'approved'],
+    'PATENT': ['patent', 'patents'],
+    'LAWSUIT': ['lawsuit', 'sues', 'sued', 'litigation']
+}
+HIGH_IMPORTANCE_CATALYSTS = {'EARNINGS', 'MERGER', 'FDA'}
 
 class NewsRoomService:
     def __init__(self):
@@ -14,21 +48,66 @@ class NewsRoomService:
             'https://feeds.reuters.com/reuters/businessNews',
             'https://www.marketwatch.com/rss/marketpulse',
         ]
+        self.news_sources.extend(url for url in self._load_news_sources(os.getenv('NEWS_SOURCES_PATH'))
+                                 if url not in self.news_sources)
         self.latest_news = []
         
+        # Every story seen, deduplicated and ordered by publish time
+        self.news_index = NewsIndex(max_items=int(os.getenv('NEWS_HISTORY_SIZE', 5000)))
+        
+        # New stories are pushed to subscribers as soon as they are indexed
+        self.news_bus = NewsBus()
+        
+        # Catalyst terms compiled into one matcher; sentiment is scored a whole feed at a time
+        sentiment_lexicon, catalyst_lexicon = self._load_lexicon(os.getenv('NEWS_LEXICON_PATH'))
+        self.keyword_matcher = self._build_keyword_matcher(catalyst_lexicon)
+        self.sentiment_scorer = LexiconScorer.from_lexicon(sentiment_lexicon)
+        self.ticker_extractor = TickerExtractor(dictionary_path=os.getenv('TICKER_DICTIONARY_PATH'))
+        
+        # New stories are archived with a full-text index, one transaction per refresh
+        self.news_archive = NewsArchive(path=os.getenv('NEWS_ARCHIVE_PATH', 'data/news_archive.db'))
+        self.event_study = EventStudy(benchmark=os.getenv('EVENT_STUDY_BENCHMARK', 'SPY'))
+        
+        # Feeds are downloaded concurrently and parsed off the download threads;
+        # a refresh publishes whatever is parsed by the overall deadline
+        self.feed_timeout = 5.0
+        self.refresh_deadline = 8.0
+        self.max_feed_bytes = 5 * 1024 * 1024
+        self.fetch_concurrency = int(os.getenv('NEWS_FETCH_CONCURRENCY', 8))
+        self.fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_concurrency, thread_name_prefix='news-fetch')
+        self.parse_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='news-parse')
+        self.feed_status = {}
+        
+        # While monitoring, each source is polled on its own interval, following how
+        # often it has published lately; at most fetch_concurrency polls run at once
+        self.feed_scheduler = FeedScheduler(
+            min_interval=float(os.getenv('NEWS_POLL_MIN_SECONDS', 30)),
+            max_interval=float(os.getenv('NEWS_POLL_MAX_SECONDS', 1800)),
+            max_concurrency=self.fetch_concurrency
+        )
+        for url in self.news_sources:
+            self.feed_scheduler.add_source(url)
+        
+        # Per-source ETag/Last-Modified and the items parsed from that version;
+        # a 304 reuses the items without downloading or parsing
+        self.feed_validators = {}
+        self.parsed_feeds = {}
+        
     def start_monitoring(self):
         """Start monitoring news feeds"""
         def monitor_loop():
-            self.is_monitoring = True
+            print(f"📰 News Room monitoring {len(self.feed_scheduler)} feeds at {datetime.now()}")
             while self.is_monitoring:
                 try:
-                    print(f"📰 News Room monitoring at {datetime.now()}")
-                    self._fetch_latest_news()
-                    time.sleep(300)  # Check every 5 minutes
+                    for url in self.feed_scheduler.take_due():
+                        self._fetch_feed(url).add_done_callback(
+                            lambda future, url=url: self._on_feed_polled(url, future))
+                    time.sleep(1)
                 except Exception as e:
                     print(f"News monitoring error: {e}")
                     time.sleep(60)
         
+        self.is_monitoring = True
         monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
         monitor_thread.start()
     
@@ -40,86 +119,276 @@ class NewsRoomService:
     def _fetch_latest_news(self):
         """Fetch latest financial news"""
         try:
-            all_news = []
+            started = time.time()
+            deadline = started + self.refresh_deadline
+            parsed = [self._fetch_feed(url, deadline) for url in self.news_sources]
+            done, _ = wait(parsed, timeout=max(deadline - time.time(), 0))
             
-            for source_url in self.news_sources:
+            added, refreshed = [], 0
+            for url, future in zip(self.news_sources, parsed):
+                if future not in done:
+                    self.feed_status[url] = {'ok': False, 'error': 'deadline exceeded', 'checked': datetime.now().isoformat()}
+                    continue
                 try:
-                    feed = feedparser.parse(source_url)
-                    
-                    for entry in feed.entries[:5]:  # Get top 5 from each source
-                        news_item = {
-                            'title': entry.get('title', ''),
-                            'summary': entry.get('summary', ''),
-                            'link': entry.get('link', ''),
-                            'published': entry.get('published', ''),
-                            'source': source_url,
-                            'sentiment': self._analyze_news_sentiment(entry.get('title', '')),
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        all_news.append(news_item)
-                        
+                    added.extend(self.news_index.add_many(future.result()))
+                    refreshed += 1
                 except Exception as e:
-                    print(f"Error fetching from {source_url}: {e}")
-                    continue
+                    print(f"Error fetching from {url}: {e}")
             
-            # Sort by timestamp and keep most recent
-            all_news.sort(key=lambda x: x['timestamp'], reverse=True)
-            self.latest_news = all_news[:20]  # Keep top 20
+            self.latest_news = self.news_index.latest(20)
+            self.news_bus.publish(added)
+            self.news_archive.add_many(added)
+            print(f"📰 {refreshed}/{len(parsed)} feeds refreshed in {time.time() - started:.2f}s, {len(added)} new stories")
             
         except Exception as e:
             print(f"Error fetching news: {e}")
     
+    def _on_feed_polled(self, url: str, future: Future):
+        """Index and archive one scheduled poll's new stories, then reschedule the source"""
+        try:
+            added = self.news_index.add_many(future.result())
+        except Exception as e:
+            print(f"Error fetching from {url}: {e}")
+            self.feed_scheduler.complete(url, 0, success=False)
+            return
+        try:
+            if added:
+                self.latest_news = self.news_index.latest(20)
+                self.news_bus.publish(added)
+                self.news_archive.add_many(added)
+                print(f"📰 {len(added)} new stories from {url}")
+        finally:
+            self.feed_scheduler.complete(url, len(added))
+    
+    def _load_news_sources(self, path: Optional[str] = None) -> List[str]:
+        """Extra feed URLs, one per line ('#' comments allowed) or a JSON list"""
+        if not path:
+            return []
+        try:
+            with open(path) as f:
+                text = f.read()
+            if text.lstrip().startswith('['):
+                return [str(url).strip() for url in json.loads(text) if str(url).strip()]
+            return [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith('#')]
+        except Exception as e:
+            print(f"News sources load error: {e}")
+            return []
+    
+    def get_feed_schedule(self) -> List[Dict]:
+        """Polling interval, publish rate and last fetch status per source"""
+        schedule = self.feed_scheduler.snapshot()
+        for entry in schedule:
+            entry['status'] = self.feed_status.get(entry['url'])
+        return schedule
+    
+    def _fetch_feed(self, url: str, deadline: Optional[float] = None) -> Future:
+        """Download on the fetch pool, then parse on the parse pool; the returned future holds the items"""
+        result = Future()
+        
+        def parsed(future):
+            try:
+                result.set_result(future.result())
+            except Exception as e:
+                result.set_exception(e)
+        
+        def downloaded(future):
+            try:
+                body, validators = future.result()
+            except Exception as e:
+                self.feed_status[url] = {'ok': False, 'error': str(e), 'checked': datetime.now().isoformat()}
+                result.set_exception(e)
+                return
+            if body is None:
+                self.feed_status[url] = {'ok': True, 'items': len(self.parsed_feeds[url]),
+                                         'not_modified': True, 'checked': datetime.now().isoformat()}
+                result.set_result(self.parsed_feeds[url])
+                return
+            self.parse_pool.submit(self._parse_feed, url, body, validators).add_done_callback(parsed)
+        
+        self.fetch_pool.submit(self._download_feed, url, deadline).add_done_callback(downloaded)
+        return result
+    
+    def _download_feed(self, url: str, deadline: Optional[float] = None) -> tuple:
+        """Read one feed's body, giving up after feed_timeout or at the refresh deadline, whichever is first.
+
+        The timeout starts when the download does, not when it was queued, so
+        feeds waiting for a fetch worker are not charged for the wait.
+
+        Returns (body, validators); body is None when the server answers 304 to
+        the stored ETag/Last-Modified, or sends the same bytes again, so the
+        cached items are still current.
+        """
+        headers = {'User-Agent': 'Mozilla/5.0 (compatible; NewsRoom/1.0)'}
+        previous = self.feed_validators.get(url) if url in self.parsed_feeds else None
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        
+        started = time.time()
+        feed_deadline = started + self.feed_timeout if deadline is None else min(started + self.feed_timeout, deadline)
+        remaining = feed_deadline - started
+        if remaining <= 0:
+            raise TimeoutError('refresh deadline passed before the download started')
+        
+        chunks, size = [], 0
+        with requests.get(url, timeout=(min(remaining, 3.0), remaining), stream=True, headers=headers) as response:
+            if response.status_code == 304 and previous:
+                return None, previous
+            response.raise_for_status()
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+            for chunk in response.iter_content(chunk_size=16384):
+                chunks.append(chunk)
+                size += len(chunk)
+                if time.time() > feed_deadline:
+                    raise TimeoutError(f"feed deadline of {remaining:.1f}s exceeded")
+                if size > self.max_feed_bytes:
+                    raise ValueError('feed too large')
+        body = b''.join(chunks)
+        # Servers that send no validators still skip the parse when the body is unchanged
+        validators['digest'] = hashlib.sha1(body).hexdigest()
+        if previous and previous.get('digest') == validators['digest']:
+            # Keep the server's new validators so the next poll can get a 304
+            self.feed_validators[url] = validators
+            return None, validators
+        return body, validators
+    
+    def _parse_feed(self, url: str, body: bytes, validators: Optional[Dict] = None) -> List[Dict]:
+        """Parse a downloaded feed into news items"""
+        feed = feedparser.parse(body)
+        fetched = time.time()
+        sentiments = self.sentiment_scorer.labels(
+            self.sentiment_scorer.score([entry.get('title', '') for entry in feed.entries]))
+        news = []
+        for entry, sentiment in zip(feed.entries, sentiments):
+            published_ts = published_timestamp(entry, default=fetched)
+            news.append({
+                'id': news_id({**entry, 'source': url}),
+                'title': entry.get('title', ''),
+                'summary': entry.get('summary', ''),
+                'link': entry.get('link', ''),
+                'published': entry.get('published', ''),
+                'published_at': published_iso(published_ts),
+                'published_ts': published_ts,
+                'source': url,
+                'symbols': self.ticker_extractor.extract(entry.get('title', ''), entry.get('summary', '')),
+                'timestamp': datetime.now().isoformat(),
+                'sentiment': sentiment,
+                'catalysts': list(dict.fromkeys(self.keyword_matcher.payloads(entry.get('title', ''))))
+            })
+        self.parsed_feeds[url] = news
+        if validators:
+            self.feed_validators[url] = validators
+        self.feed_status[url] = {'ok': True, 'items': len(news), 'checked': datetime.now().isoformat()}
+        return news
+    
+    def _load_lexicon(self, lexicon_path: Optional[str] = None) -> tuple:
+        """(sentiment, catalysts) lexicons: the built-in terms plus NEWS_LEXICON_PATH's"""
+        sentiment = {k: dict.fromkeys(v, 1.0) for k, v in SENTIMENT_LEXICON.items()}
+        catalysts = {k: list(v) for k, v in CATALYST_LEXICON.items()}
+        if lexicon_path:
+            try:
+                with open(lexicon_path) as f:
+                    extra = json.load(f)
+                for polarity in ('positive', 'negative'):
+                    terms = extra.get(polarity, [])
+                    # A list adds terms of weight 1; {term: weight} sets weights
+                    sentiment[polarity].update(terms if isinstance(terms, dict) else dict.fromkeys(terms, 1.0))
+                for catalyst, terms in extra.get('catalysts', {}).items():
+                    catalysts.setdefault(catalyst.upper(), []).extend(terms)
+            except Exception as e:
+                print(f"News lexicon load error: {e}")
+        return sentiment, catalysts
+    
+    def _build_keyword_matcher(self, catalysts: Dict[str, List[str]]) -> KeywordMatcher:
+        terms = {}
+        for catalyst, words in catalysts.items():
+            terms.update({word: catalyst for word in words})
+        return KeywordMatcher(terms)
+    
+    def _tag_headline(self, title: str) -> dict:
+        """Sentiment and catalyst types of one headline"""
+        catalysts = list(dict.fromkeys(self.keyword_matcher.payloads(title)))
+        return {'sentiment': self.sentiment_scorer.score_one(title), 'catalysts': catalysts}
+    
     def _analyze_news_sentiment(self, title: str) -> dict:
         """Simple sentiment analysis of news titles"""
         try:
-            positive_words = ['gains', 'rises', 'up', 'bullish', 'positive', 'growth', 'strong', 'beats', 'upgrade']
-            negative_words = ['falls', 'drops', 'down', 'bearish', 'negative', 'decline', 'weak', 'misses', 'downgrade']
-            
-            title_lower = title.lower()
-            
-            positive_count = sum(1 for word in positive_words if word in title_lower)
-            negative_count = sum(1 for word in negative_words if word in title_lower)
-            
-            if positive_count > negative_count:
-                return {'sentiment': 'positive', 'score': positive_count}
-            elif negative_count > positive_count:
-                return {'sentiment': 'negative', 'score': -negative_count}
-            else:
-                return {'sentiment': 'neutral', 'score': 0}
-                
+            return self.sentiment_scorer.score_one(title)
         except Exception as e:
             print(f"Sentiment analysis error: {e}")
             return {'sentiment': 'neutral', 'score': 0}
     
-    def get_latest_news(self) -> List[Dict]:
-        """Get latest news items"""
+    def get_latest_news(self, limit: int = 20) -> List[Dict]:
+        """Get latest news items, newest first"""
         try:
-            if not self.latest_news:
+            if not len(self.news_index):
                 self._fetch_latest_news()
             
-            return self.latest_news
+            return self.news_index.latest(limit)
             
         except Exception as e:
             print(f"Error getting news: {e}")
             return []
     
+    def get_news_for_symbol(self, symbol: str, limit: int = 20) -> List[Dict]:
+        """Newest news items mentioning symbol, from the symbol index"""
+        try:
+            if not len(self.news_index):
+                self._fetch_latest_news()
+            
+            return self.news_index.for_symbol(symbol, limit)
+            
+        except Exception as e:
+            print(f"Error getting news for {symbol}: {e}")
+            return []
+    
+    def search_news(self, query: Optional[str] = None, symbol: Optional[str] = None,
+                    catalyst: Optional[str] = None, since: Optional[float] = None,
+                    until: Optional[float] = None, limit: int = 50) -> List[Dict]:
+        """Search the news archive by text, symbol, catalyst type and publish-time range"""
+        return self.news_archive.search(query, symbol, catalyst, since, until, limit)
+    
+    def get_symbol_sentiment(self, since: Optional[float] = None) -> Dict[str, Dict]:
+        """Headline sentiment per ticker over the in-memory history (default: the last 24 hours)"""
+        since = time.time() - 86400 if since is None else since
+        items = self.news_index.latest(len(self.news_index), since=since)
+        scores = [(item.get('sentiment') or {}).get('score') or 0 for item in items]
+        return aggregate_by_symbol(scores, [item.get('symbols', []) for item in items])
+    
+    def rescore_archive(self) -> int:
+        """Re-score every archived headline with the current lexicon (e.g. after editing it)"""
+        return self.news_archive.rescore(self.sentiment_scorer)
+    
+    def get_event_study(self, since: Optional[float] = None, until: Optional[float] = None) -> Dict:
+        """Abnormal returns after archived stories, by catalyst type and sentiment bucket.
+
+        Defaults to the last 59 days, about as far back as 5-minute bars go.
+        """
+        since = time.time() - 59 * 86400 if since is None else since
+        events = pd.DataFrame(self.news_archive.events(since, until),
+                              columns=['published_ts', 'symbol', 'sentiment_score', 'catalysts'])
+        return self.event_study.run(events)
+    
     def get_catalyst_analysis(self) -> List[Dict]:
         """Get potential market catalysts from news"""
         try:
             catalysts = []
-            catalyst_keywords = ['earnings', 'merger', 'acquisition', 'ipo', 'fda', 'approval', 'patent', 'lawsuit']
             
             for news_item in self.latest_news:
-                title_lower = news_item.get('title', '').lower()
-                
-                for keyword in catalyst_keywords:
-                    if keyword in title_lower:
-                        catalysts.append({
-                            **news_item,
-                            'catalyst_type': keyword.upper(),
-                            'importance': 'HIGH' if keyword in ['earnings', 'merger', 'fda'] else 'MEDIUM'
-                        })
-                        break
+                found = news_item.get('catalysts')
+                if found is None:
+                    found = self._tag_headline(news_item.get('title', ''))['catalysts']
+                if found:
+                    catalysts.append({
+                        **news_item,
+                        'catalyst_type': found[0],
+                        'importance': 'HIGH' if found[0] in HIGH_IMPORTANCE_CATALYSTS else 'MEDIUM'
+                    })
             
             return catalysts[:10]  # Return top 10 catalysts
             
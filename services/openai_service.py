@@ -1,11 +1,30 @@
 
-import openai
 import os
 import json
+import math
 import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import time
+from .llm_cache import LLMResponseCache, market_fingerprint
+from .shared_cache import SharedAnalysisCache, stable_int
+from .llm_telemetry import ProviderTelemetry, LLMRouter, HedgeBudget
+from .llm_governor import PRIORITY_INTERACTIVE, shared_governor
+from .llm_context import ContextBuilder
+
+# Expert reply fields that feed the team consensus averages
+MULTI_BRAIN_NUMBERS = ('target_1', 'target_2', 'target_3', 'stop_loss', 'confidence')
+
+
+def model_number(value, default: float) -> float:
+    """A number from model JSON ("42", "42%" and 42 alike); default when missing, null or not numeric"""
+    try:
+        number = float(value.strip().rstrip('%')) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError, AttributeError):
+        return default
+    return number if math.isfinite(number) and not isinstance(value, bool) else default
+
 
 class OpenAIService:
     def __init__(self):
@@ -13,8 +32,77 @@ class OpenAIService:
         self.anthropic_key = os.getenv('ANTHROPIC_API_KEY')
         self.gemini_key = os.getenv('GEMINI_API_KEY')
         
-        if self.api_key:
-            openai.api_key = self.api_key
+        self.openai_model = 'gpt-3.5-turbo'
+        self.anthropic_model = 'claude-3-sonnet-20240229'
+        self.system_prompt = "You are a professional trading analyst providing concise, actionable insights."
+        
+        # Market data goes into prompts as compact feature blocks held to a token budget
+        self.context_builder = ContextBuilder(budget=int(os.getenv('LLM_CONTEXT_BUDGET', 120)), model=self.openai_model)
+        self.batch_row_budget = int(os.getenv('LLM_BATCH_ROW_BUDGET', 40))
+        
+        # Overridable so the AI layer can run against a local stand-in (llm_standin_server.py)
+        self.openai_base_url = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1').rstrip('/')
+        self.anthropic_base_url = os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com/v1').rstrip('/')
+        
+        # Repeat questions about the same symbol and price bucket skip the network
+        self.response_cache = LLMResponseCache(
+            ttl=float(os.getenv('LLM_CACHE_TTL', 300)),
+            max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1000)),
+            path=os.getenv('LLM_CACHE_PATH')
+        )
+        
+        # Finished analyses shared across worker processes, keyed by stable content hashes;
+        # an empty ANALYSIS_CACHE_PATH turns the cache off
+        self.analysis_cache = SharedAnalysisCache(
+            path=os.getenv('ANALYSIS_CACHE_PATH', 'data/analysis_cache.db') or None,
+            ttl=float(os.getenv('ANALYSIS_CACHE_TTL', 300))
+        )
+        
+        # Independent experts are asked concurrently, each with its own deadline
+        self.expert_deadline = float(os.getenv('AI_EXPERT_DEADLINE', 8))
+        self.expert_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='ai-expert')
+        self.swarm_agents = [
+            ('Technical Titan', 'Technical Analysis'),
+            ('Fundamental Prophet', 'Fundamental Analysis'),
+            ('Sentiment Sage', 'Market Sentiment'),
+            ('Risk Realist', 'Risk Management'),
+            ('Momentum Master', 'Momentum Trading')
+        ]
+        self.multi_brain_experts = [
+            ('Technical Titan', 'chart structure, momentum and volume'),
+            ('Fundamental Prophet', 'valuation, earnings and fundamentals'),
+            ('Sentiment Sage', 'news flow, positioning and market sentiment')
+        ]
+        
+        # Provider specs: prices in USD per 1M tokens, latency prior until telemetry warms up
+        self.providers = {
+            'anthropic': {
+                'name': 'Anthropic Claude',
+                'model': self.anthropic_model,
+                'input_cost': 3.00,
+                'output_cost': 15.00,
+                'expected_latency_ms': 2500
+            },
+            'openai': {
+                'name': 'OpenAI GPT',
+                'model': self.openai_model,
+                'input_cost': 0.50,
+                'output_cost': 1.50,
+                'expected_latency_ms': 1500
+            }
+        }
+        self.telemetry = ProviderTelemetry(window_seconds=float(os.getenv('LLM_TELEMETRY_WINDOW', 3600)))
+        self.router = LLMRouter(self.telemetry, self.providers, objective=os.getenv('LLM_ROUTING_OBJECTIVE', 'latency'))
+        
+        # A call still running past the provider's observed p90 is duplicated to the next-best provider
+        self.hedge_percentile = float(os.getenv('LLM_HEDGE_PERCENTILE', 90))
+        self.hedge_budget = HedgeBudget(max_fraction=float(os.getenv('LLM_HEDGE_MAX_FRACTION', 0.1)))
+        self.hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix='llm-hedge')
+        
+        # Per-provider concurrency shared by every instance in the process; calls without
+        # an explicit priority use this instance's default
+        self.governor = shared_governor()
+        self.default_priority = PRIORITY_INTERACTIVE
     
     def generate_predictions(self, symbol: str, quote: dict, time_horizon: str = '1d') -> dict:
         """Generate AI-powered market predictions"""
@@ -75,46 +163,83 @@ class OpenAIService:
             print(f"Prediction generation error: {e}")
             return {"error": str(e)}
     
+    def _prediction_prompt(self, symbol: str, quote: dict, time_horizon: str) -> str:
+        return (
+            f"{self.context_builder.symbol_block(symbol, quote)}\n"
+            f"Give a concise {time_horizon} outlook: direction, key levels, main drivers and risks."
+        )
+    
+    def get_market_prediction(self, symbol: str, time_horizon: str = '1d', quote: Optional[dict] = None) -> dict:
+        """Structured prediction with model commentary when a provider is available"""
+        quote = quote or {'symbol': symbol}
+        prediction = self.generate_predictions(symbol, quote, time_horizon)
+        commentary = self._call_llm(self._prediction_prompt(symbol, quote, time_horizon), 400, market_state=quote)
+        if commentary:
+            prediction['ai_insight'] = commentary
+        return prediction
+    
+    def stream_market_prediction(self, symbol: str, time_horizon: str = '1d', quote: Optional[dict] = None):
+        """Yield {'type': 'token'} events as the model writes, then one {'type': 'summary'} event"""
+        quote = quote or {'symbol': symbol}
+        parts = []
+        for token in self._stream_llm(self._prediction_prompt(symbol, quote, time_horizon), 400, market_state=quote):
+            parts.append(token)
+            yield {'type': 'token', 'text': token}
+        
+        prediction = self.generate_predictions(symbol, quote, time_horizon)
+        if parts:
+            prediction['ai_insight'] = ''.join(parts).strip()
+        yield {'type': 'summary', 'data': prediction}
+    
+    def stream_strategy_commentary(self, symbol: str, stock_data: dict):
+        """Stream the strategy room's trade plan narrative"""
+        prompt = (
+            f"{self.context_builder.symbol_block(symbol, stock_data)}\n"
+            "Lay out a trade plan: setup, entry, three targets, stop loss and what would invalidate it."
+        )
+        return self._stream_llm(prompt, 500, market_state=stock_data)
+    
     def get_swarm_analysis(self, symbol: str) -> dict:
         """Get AI swarm intelligence analysis"""
+        return self.analysis_cache.get_or_compute(
+            'swarm', (symbol.upper(),), lambda: self._compute_swarm_analysis(symbol), cacheable=self._is_complete
+        )
+    
+    def _is_complete(self, result: dict) -> bool:
+        """Only full answers are shared; errors and partial (timed-out) results are recomputed"""
+        return 'error' not in result and not result.get('timed_out')
+    
+    def _compute_swarm_analysis(self, symbol: str) -> dict:
         try:
-            agents = [
-                {
-                    'name': 'Technical Titan',
-                    'specialty': 'Technical Analysis',
-                    'signal': 'BUY' if hash(symbol) % 2 else 'SELL',
-                    'confidence': 85 + (hash(symbol) % 15),
-                    'reasoning': 'Strong momentum patterns with volume confirmation'
-                },
-                {
-                    'name': 'Fundamental Prophet', 
-                    'specialty': 'Fundamental Analysis',
-                    'signal': 'BUY' if hash(symbol + 'fund') % 2 else 'HOLD',
-                    'confidence': 78 + (hash(symbol) % 20),
-                    'reasoning': 'Solid earnings growth with reasonable valuation'
-                },
-                {
-                    'name': 'Sentiment Sage',
-                    'specialty': 'Market Sentiment',
-                    'signal': 'BUY' if hash(symbol + 'sent') % 3 else 'SELL',
-                    'confidence': 72 + (hash(symbol) % 25),
-                    'reasoning': 'Positive social media buzz and analyst upgrades'
-                },
-                {
-                    'name': 'Risk Realist',
-                    'specialty': 'Risk Management', 
-                    'signal': 'HOLD',
-                    'confidence': 90,
-                    'reasoning': 'Current risk-reward ratio is acceptable with proper stops'
-                },
-                {
-                    'name': 'Momentum Master',
-                    'specialty': 'Momentum Trading',
-                    'signal': 'BUY' if hash(symbol + 'mom') % 2 else 'SELL',
-                    'confidence': 88 + (hash(symbol) % 10),
-                    'reasoning': 'Breakout pattern with increasing volume support'
-                }
-            ]
+            context = self.context_builder.symbol_block(symbol)
+            prompts = {
+                name: (
+                    f"You are {name}, a {specialty.lower()} specialist. Give your short-term view on:\n{context}\n"
+                    'Reply with JSON only: {"signal": "BUY|SELL|HOLD", "confidence": 0-100, "reasoning": "<one sentence>"}'
+                )
+                for name, specialty in self.swarm_agents
+            }
+            
+            answers, timed_out = self._fan_out(prompts, market_state={'symbol': symbol}, max_tokens=150)
+            
+            agents = []
+            for name, specialty in self.swarm_agents:
+                if name in timed_out:
+                    continue
+                # A malformed field falls back to the rule-based view for that field only
+                fallback = self._swarm_fallback(name, symbol)
+                reply = answers.get(name) or fallback
+                signal = str(reply.get('signal') or '').strip().upper()
+                agents.append({
+                    'name': name,
+                    'specialty': specialty,
+                    'signal': signal if signal in ('BUY', 'SELL', 'HOLD') else fallback['signal'],
+                    'confidence': model_number(reply.get('confidence'), fallback['confidence']),
+                    'reasoning': str(reply.get('reasoning') or fallback['reasoning'])
+                })
+            
+            if not agents:
+                return {"error": "All swarm agents timed out", 'timed_out': timed_out}
             
             # Calculate consensus
             buy_votes = len([a for a in agents if a['signal'] == 'BUY'])
@@ -138,6 +263,7 @@ class OpenAIService:
                 'buy_votes': buy_votes,
                 'sell_votes': sell_votes,
                 'hold_votes': hold_votes,
+                'timed_out': timed_out,
                 'analysis_time': datetime.now().isoformat()
             }
             
@@ -145,62 +271,83 @@ class OpenAIService:
             print(f"Swarm analysis error: {e}")
             return {"error": str(e)}
     
+    def _swarm_fallback(self, name: str, symbol: str) -> dict:
+        """Rule-based agent view used when no model answered"""
+        fallbacks = {
+            'Technical Titan': {
+                'signal': 'BUY' if stable_int(symbol) % 2 else 'SELL',
+                'confidence': 85 + (stable_int(symbol) % 15),
+                'reasoning': 'Strong momentum patterns with volume confirmation'
+            },
+            'Fundamental Prophet': {
+                'signal': 'BUY' if stable_int(symbol + 'fund') % 2 else 'HOLD',
+                'confidence': 78 + (stable_int(symbol) % 20),
+                'reasoning': 'Solid earnings growth with reasonable valuation'
+            },
+            'Sentiment Sage': {
+                'signal': 'BUY' if stable_int(symbol + 'sent') % 3 else 'SELL',
+                'confidence': 72 + (stable_int(symbol) % 25),
+                'reasoning': 'Positive social media buzz and analyst upgrades'
+            },
+            'Risk Realist': {
+                'signal': 'HOLD',
+                'confidence': 90,
+                'reasoning': 'Current risk-reward ratio is acceptable with proper stops'
+            },
+            'Momentum Master': {
+                'signal': 'BUY' if stable_int(symbol + 'mom') % 2 else 'SELL',
+                'confidence': 88 + (stable_int(symbol) % 10),
+                'reasoning': 'Breakout pattern with increasing volume support'
+            }
+        }
+        return fallbacks[name]
+    
     def get_multi_brain_analysis(self, symbol: str, stock_data: dict) -> dict:
         """Get multi-brain AI team analysis for strategy room"""
+        return self.analysis_cache.get_or_compute(
+            'multi_brain', (symbol.upper(), market_fingerprint(stock_data)),
+            lambda: self._compute_multi_brain_analysis(symbol, stock_data), cacheable=self._is_complete
+        )
+    
+    def _compute_multi_brain_analysis(self, symbol: str, stock_data: dict) -> dict:
         try:
             current_price = stock_data.get('price', 0)
             change_percent = stock_data.get('change_percent', 0)
             
-            # 8 AI experts analysis
-            experts = [
-                {
-                    'name': 'Technical Titan',
-                    'analysis': f'Strong {("bullish" if change_percent > 0 else "bearish")} momentum at ${current_price}',
-                    'target_1': round(current_price * 1.05, 2),
-                    'target_2': round(current_price * 1.12, 2), 
-                    'target_3': round(current_price * 1.25, 2),
-                    'probability_1': '75%',
-                    'probability_2': '45%',
-                    'probability_3': '20%',
-                    'expected_date_1': '2-3 days',
-                    'expected_date_2': '1-2 weeks',
-                    'expected_date_3': '3-4 weeks',
-                    'stop_loss': round(current_price * 0.92, 2),
-                    'confidence': 85
-                },
-                {
-                    'name': 'Fundamental Prophet',
-                    'analysis': f'Fair value analysis suggests {symbol} is fairly valued at current levels',
-                    'target_1': round(current_price * 1.08, 2),
-                    'target_2': round(current_price * 1.18, 2),
-                    'target_3': round(current_price * 1.35, 2),
-                    'probability_1': '70%',
-                    'probability_2': '40%',
-                    'probability_3': '15%',
-                    'expected_date_1': '1 week',
-                    'expected_date_2': '1 month',
-                    'expected_date_3': '2-3 months',
-                    'stop_loss': round(current_price * 0.88, 2),
-                    'confidence': 78
-                },
-                {
-                    'name': 'Sentiment Sage',
-                    'analysis': f'Market sentiment for {symbol} is currently neutral with positive catalysts ahead',
-                    'target_1': round(current_price * 1.06, 2),
-                    'target_2': round(current_price * 1.15, 2),
-                    'target_3': round(current_price * 1.28, 2),
-                    'probability_1': '68%',
-                    'probability_2': '42%',
-                    'probability_3': '18%',
-                    'expected_date_1': '3-5 days',
-                    'expected_date_2': '2-3 weeks',
-                    'expected_date_3': '1-2 months',
-                    'stop_loss': round(current_price * 0.90, 2),
-                    'confidence': 72
-                }
-            ]
+            context = self.context_builder.symbol_block(symbol, stock_data)
+            prompts = {
+                name: (
+                    f"You are {name}, focused on {focus}.\n{context}\n"
+                    "Give three upside targets with probabilities and expected timeframes, plus a stop loss. "
+                    'Reply with JSON only: {"analysis": "<one sentence>", "target_1": float, "target_2": float, '
+                    '"target_3": float, "probability_1": "NN%", "probability_2": "NN%", "probability_3": "NN%", '
+                    '"expected_date_1": str, "expected_date_2": str, "expected_date_3": str, '
+                    '"stop_loss": float, "confidence": 0-100}'
+                )
+                for name, focus in self.multi_brain_experts
+            }
+            
+            answers, timed_out = self._fan_out(prompts, market_state=stock_data, max_tokens=300)
+            
+            experts = []
+            for name, _ in self.multi_brain_experts:
+                if name in timed_out:
+                    continue
+                fallback = self._multi_brain_fallback(name, symbol, current_price, change_percent)
+                reply = answers.get(name) or {}
+                expert = {'name': name}
+                for key, default in fallback.items():
+                    # A malformed field falls back to the rule-based value for that field only
+                    if key in MULTI_BRAIN_NUMBERS:
+                        expert[key] = model_number(reply.get(key), default)
+                    else:
+                        expert[key] = reply.get(key) if reply.get(key) is not None else default
+                experts.append(expert)
             
-            # Calculate team consensus
+            if not experts:
+                return {"error": "All experts timed out", 'timed_out': timed_out}
+            
+            # Calculate team consensus from the experts that answered in time
             avg_target_1 = sum(e['target_1'] for e in experts) / len(experts)
             avg_target_2 = sum(e['target_2'] for e in experts) / len(experts)
             avg_target_3 = sum(e['target_3'] for e in experts) / len(experts)
@@ -217,6 +364,7 @@ class OpenAIService:
                     'stop_loss': round(avg_stop, 2),
                     'confidence': round(avg_confidence, 1)
                 },
+                'timed_out': timed_out,
                 'analysis_time': datetime.now().isoformat()
             }
             
@@ -224,11 +372,321 @@ class OpenAIService:
             print(f"Multi-brain analysis error: {e}")
             return {"error": str(e)}
     
+    def _multi_brain_fallback(self, name: str, symbol: str, current_price: float, change_percent: float) -> dict:
+        """Rule-based expert view used when no model answered"""
+        fallbacks = {
+            'Technical Titan': {
+                'analysis': f'Strong {("bullish" if change_percent > 0 else "bearish")} momentum at ${current_price}',
+                'target_1': round(current_price * 1.05, 2),
+                'target_2': round(current_price * 1.12, 2), 
+                'target_3': round(current_price * 1.25, 2),
+                'probability_1': '75%',
+                'probability_2': '45%',
+                'probability_3': '20%',
+                'expected_date_1': '2-3 days',
+                'expected_date_2': '1-2 weeks',
+                'expected_date_3': '3-4 weeks',
+                'stop_loss': round(current_price * 0.92, 2),
+                'confidence': 85
+            },
+            'Fundamental Prophet': {
+                'analysis': f'Fair value analysis suggests {symbol} is fairly valued at current levels',
+                'target_1': round(current_price * 1.08, 2),
+                'target_2': round(current_price * 1.18, 2),
+                'target_3': round(current_price * 1.35, 2),
+                'probability_1': '70%',
+                'probability_2': '40%',
+                'probability_3': '15%',
+                'expected_date_1': '1 week',
+                'expected_date_2': '1 month',
+                'expected_date_3': '2-3 months',
+                'stop_loss': round(current_price * 0.88, 2),
+                'confidence': 78
+            },
+            'Sentiment Sage': {
+                'analysis': f'Market sentiment for {symbol} is currently neutral with positive catalysts ahead',
+                'target_1': round(current_price * 1.06, 2),
+                'target_2': round(current_price * 1.15, 2),
+                'target_3': round(current_price * 1.28, 2),
+                'probability_1': '68%',
+                'probability_2': '42%',
+                'probability_3': '18%',
+                'expected_date_1': '3-5 days',
+                'expected_date_2': '2-3 weeks',
+                'expected_date_3': '1-2 months',
+                'stop_loss': round(current_price * 0.90, 2),
+                'confidence': 72
+            }
+        }
+        return fallbacks[name]
+    
+    def analyze_symbols_batch(self, rows: List[Dict], batch_size: int = 25, objective: Optional[str] = None,
+                              priority: Optional[int] = None) -> Dict[str, Optional[dict]]:
+        """Analyze many symbols with a few structured-output calls instead of one call each.
+
+        Each row is reduced to a compact feature line and packed into one
+        request per batch. A batch whose reply cannot be parsed, or that is
+        missing symbols, is split in half and retried; symbols that still fail
+        on their own map to None. When no reply arrives at all (providers down,
+        or the call was turned away) no further calls are made and every
+        symbol not yet analyzed maps to None.
+        """
+        features = {}
+        for row in rows:
+            symbol = row.get('symbol')
+            if symbol and symbol not in features:
+                features[symbol] = self._compact_feature_row(row)
+        
+        results: Dict[str, Optional[dict]] = {}
+        symbols = list(features)
+        batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        
+        while batches:
+            batch = batches.pop()
+            parsed = self._analyze_batch(batch, features, objective, priority)
+            if parsed is None:
+                # Splitting would only repeat the failed call; an outage should not multiply requests
+                for sym in batch + [sym for pending in batches for sym in pending]:
+                    results[sym] = None
+                break
+            missing = [sym for sym in batch if sym not in parsed]
+            results.update(parsed)
+            
+            if not missing:
+                continue
+            if len(batch) == 1:
+                results[batch[0]] = None
+            else:
+                half = (len(missing) + 1) // 2
+                batches.extend([part for part in (missing[:half], missing[half:]) if part])
+        
+        return results
+    
+    def _compact_feature_row(self, row: Dict) -> str:
+        """One line per symbol from the context builder, held to batch_row_budget tokens"""
+        return self.context_builder.symbol_block(row['symbol'], row, budget=self.batch_row_budget, separator=' | ')
+    
+    def _analyze_batch(self, batch: List[str], features: Dict[str, str],
+                       objective: Optional[str] = None, priority: Optional[int] = None) -> Optional[Dict[str, dict]]:
+        """One structured-output call for a batch; returns only the symbols that parsed, or None without a reply"""
+        prompt = (
+            "Rate each stock below for a short-term trade. One line per stock: symbol and quote, "
+            "then scanner fields (sig = scan signal, str = strength).\n"
+            + '\n'.join(features[sym] for sym in batch) + '\n'
+            'Reply with JSON only: {"results": [{"symbol": str, "signal": "BUY|SELL|HOLD", '
+            '"confidence": 0-100, "commentary": "<one sentence>"}]} with one entry per symbol.'
+        )
+        reply = self._call_llm(prompt, max_tokens=60 * len(batch) + 100, objective=objective,
+                               json_output=True, priority=priority)
+        if reply is None:
+            return None
+        parsed = self._parse_json_reply(reply)
+        if not parsed or not isinstance(parsed.get('results'), list):
+            return {}
+        
+        wanted = set(batch)
+        results = {}
+        for item in parsed['results']:
+            if not isinstance(item, dict):
+                continue
+            symbol = str(item.get('symbol', '')).upper()
+            if symbol in wanted and item.get('signal'):
+                results[symbol] = {
+                    'signal': str(item['signal']).upper(),
+                    'confidence': item.get('confidence'),
+                    'commentary': item.get('commentary', '')
+                }
+        return results
+    
+    def _fan_out(self, prompts: Dict[str, str], market_state: Optional[dict] = None,
+                 max_tokens: int = 300, deadline: Optional[float] = None, priority: Optional[int] = None) -> tuple:
+        """Send every expert prompt at once and collect the JSON replies that arrive by the deadline.
+
+        Returns (answers, timed_out): answers maps expert name to the parsed
+        reply, or None when no model was available or the reply was not JSON;
+        timed_out lists the experts still running at the deadline. Their calls
+        keep running in the pool and still land in the response cache.
+        """
+        deadline = deadline if deadline is not None else self.expert_deadline
+        futures = {
+            self.expert_pool.submit(self._call_llm, prompt, max_tokens, market_state, priority=priority): name
+            for name, prompt in prompts.items()
+        }
+        
+        done, pending = wait(futures, timeout=deadline)
+        
+        answers = {}
+        for future in done:
+            name = futures[future]
+            try:
+                answers[name] = self._parse_json_reply(future.result())
+            except Exception as e:
+                print(f"Expert {name} error: {e}")
+                answers[name] = None
+        
+        timed_out = [futures[f] for f in pending]
+        for future in pending:
+            future.cancel()
+        
+        return answers, timed_out
+    
+    def _parse_json_reply(self, reply: Optional[str]) -> Optional[dict]:
+        """Extract the JSON object from a model reply"""
+        if not reply:
+            return None
+        start, end = reply.find('{'), reply.rfind('}')
+        if start < 0 or end <= start:
+            return None
+        try:
+            parsed = json.loads(reply[start:end + 1])
+            return parsed if isinstance(parsed, dict) else None
+        except json.JSONDecodeError:
+            return None
+    
+    def _configured_providers(self) -> List[str]:
+        keys = {'anthropic': self.anthropic_key, 'openai': self.api_key}
+        return [name for name, key in keys.items() if key]
+    
+    def _call_llm(self, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                  objective: Optional[str] = None, json_output: bool = False,
+                  priority: Optional[int] = None) -> Optional[str]:
+        """Call the best provider for the objective, failing over down the ranking"""
+        priority = self.default_priority if priority is None else priority
+        ranked = self.router.rank(self._configured_providers(), objective)
+        if len(ranked) > 1 and self.hedge_budget.enabled:
+            return self._call_hedged(ranked, prompt, max_tokens, market_state, json_output, priority)
+        
+        for provider in ranked:
+            reply = self._call_provider(provider, prompt, max_tokens, market_state, json_output, priority)
+            if reply is not None:
+                return reply
+        return None
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on a provider before hedging: its observed p90, or twice the prior while warming up"""
+        stats = self.telemetry.snapshot(provider)
+        if stats['successes'] >= self.router.min_samples:
+            observed = self.telemetry.latency_percentile(provider, self.hedge_percentile)
+            if observed is not None:
+                return max(observed / 1000.0, 0.2)
+        return self.providers[provider].get('expected_latency_ms', 2000) * 2 / 1000.0
+    
+    def _call_hedged(self, ranked: List[str], prompt: str, max_tokens: int, market_state: Optional[dict],
+                     json_output: bool, priority: int) -> Optional[str]:
+        """Call the best provider; once it passes its p90, also ask the next one and take the first reply.
+        
+        The loser is cancelled if it has not started; a request already on the
+        wire cannot be aborted, so its reply is discarded (it still lands in the
+        response cache). Failed calls fail over down the ranking as usual.
+        """
+        remaining = list(ranked)
+        
+        def submit(provider):
+            return self.hedge_pool.submit(self._call_provider, provider, prompt, max_tokens,
+                                          market_state, json_output, priority)
+        
+        self.hedge_budget.record_request()
+        primary = remaining.pop(0)
+        pending = {submit(primary): primary}
+        timeout = self._hedge_delay(primary)
+        hedged = False
+        
+        while pending:
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if not hedged and remaining and self.hedge_budget.try_hedge():
+                    hedged = True
+                    provider = remaining.pop(0)
+                    pending[submit(provider)] = provider
+                timeout = None
+                continue
+            
+            for future in done:
+                provider = pending.pop(future)
+                reply = future.result()
+                if reply is not None:
+                    for loser in pending:
+                        loser.cancel()
+                    if provider != primary:
+                        self.hedge_budget.record_win()
+                    return reply
+            
+            if not pending and remaining:
+                provider = remaining.pop(0)
+                pending[submit(provider)] = provider
+        return None
+    
+    def _call_provider(self, provider: str, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                       json_output: bool = False, priority: Optional[int] = None) -> Optional[str]:
+        if provider == 'anthropic':
+            return self._call_anthropic_api(prompt, max_tokens, market_state=market_state,
+                                            json_output=json_output, priority=priority)
+        if provider == 'openai':
+            return self._call_openai_api(prompt, max_tokens, market_state=market_state,
+                                         json_output=json_output, priority=priority)
+        return None
+    
+    def _degraded_reply(self, provider: str, cache_key: str) -> Optional[str]:
+        """Answer for a call the governor turned away: the last cached reply, even if
+        expired, or None so the caller fails over or uses its rule-based fallback"""
+        stale = self.response_cache.get_stale(cache_key)
+        print(f"{provider} at capacity; serving {'stale cached' if stale is not None else 'degraded'} answer")
+        return stale
+    
+    def _record_call(self, provider: str, started: float, success: bool,
+                     input_tokens: int = 0, output_tokens: int = 0, error: Optional[str] = None):
+        """Feed one network call into provider telemetry"""
+        spec = self.providers[provider]
+        cost = (input_tokens * spec['input_cost'] + output_tokens * spec['output_cost']) / 1_000_000
+        self.telemetry.record(provider, (time.time() - started) * 1000, success,
+                              input_tokens, output_tokens, cost, error)
+    
+    def get_providers_status(self) -> List[Dict]:
+        """Provider status from live telemetry, in routing order"""
+        configured = self._configured_providers()
+        ranked = self.router.rank(configured) + [p for p in self.providers if p not in configured]
+        
+        providers = []
+        for priority, provider in enumerate(ranked, start=1):
+            spec = self.providers[provider]
+            stats = self.telemetry.snapshot(provider)
+            
+            if provider not in configured:
+                status = 'not_configured'
+            elif stats['requests'] and stats['successes'] == 0:
+                status = 'error'
+            else:
+                status = 'active'
+            
+            entry = {
+                'name': spec['name'],
+                'model': spec['model'],
+                'status': status,
+                'priority': priority,
+                'cost': f"{spec['input_cost']:.2f}",
+                'successRate': stats['success_rate'] if stats['success_rate'] is not None else 0,
+                'avgResponseTime': stats['p50_ms'] or 0,
+                'p50ResponseTime': stats['p50_ms'] or 0,
+                'p95ResponseTime': stats['p95_ms'] or 0,
+                'requestsToday': stats['requests_today'],
+                'tokensUsed': stats['tokens_today'],
+                'costToday': stats['cost_today'],
+                'windowRequests': stats['requests'],
+                'windowTokens': stats['tokens'],
+                'windowCost': stats['cost'],
+                'concurrency': self.governor.metrics(provider)
+            }
+            if status == 'error' and stats['last_error']:
+                entry['error'] = stats['last_error']
+            providers.append(entry)
+        
+        return providers
+    
     def analyze_sentiment(self, symbol: str) -> dict:
         """Analyze market sentiment for symbol"""
         try:
             # Simulate sentiment analysis
-            sentiment_score = (hash(symbol) % 100) - 50  # -50 to +49
+            sentiment_score = (stable_int(symbol) % 100) - 50  # -50 to +49
             
             if sentiment_score > 20:
                 sentiment = 'Very Bullish'
@@ -264,58 +722,304 @@ class OpenAIService:
             print(f"Sentiment analysis error: {e}")
             return {"error": str(e)}
     
-    def _call_openai_api(self, prompt: str, max_tokens: int = 500) -> Optional[str]:
+    def _call_openai_api(self, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                         json_output: bool = False, priority: Optional[int] = None) -> Optional[str]:
         """Call OpenAI API with error handling"""
         try:
             if not self.api_key:
                 return None
             
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a professional trading analyst providing concise, actionable insights."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.7
+            cache_key = self.response_cache.make_key(
+                prompt, self.openai_model, market_state, system=self.system_prompt,
+                max_tokens=max_tokens, json_output=json_output
             )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
-            return response.choices[0].message.content.strip()
+            headers = {
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json'
+            }
+            
+            data = {
+                'model': self.openai_model,
+                'messages': [
+                    {'role': 'system', 'content': self.system_prompt},
+                    {'role': 'user', 'content': prompt}
+                ],
+                'max_tokens': max_tokens,
+                'temperature': 0.7
+            }
+            if json_output:
+                data['response_format'] = {'type': 'json_object'}
+            
+            priority = self.default_priority if priority is None else priority
+            with self.governor.slot('openai', priority) as granted:
+                if not granted:
+                    return self._degraded_reply('openai', cache_key)
+                started = time.time()
+                try:
+                    response = requests.post(
+                        f'{self.openai_base_url}/chat/completions',
+                        headers=headers,
+                        json=data,
+                        timeout=30
+                    )
+                except Exception as e:
+                    self._record_call('openai', started, False, error=str(e))
+                    raise
+            
+            if response.status_code == 200:
+                body = response.json()
+                usage = body.get('usage', {})
+                content = body['choices'][0]['message']['content'].strip()
+                self._record_call('openai', started, True,
+                                  usage.get('prompt_tokens') or self.context_builder.count(self.system_prompt + prompt),
+                                  usage.get('completion_tokens') or self.context_builder.count(content))
+                self.response_cache.set(cache_key, content)
+                return content
+            else:
+                self._record_call('openai', started, False, error=f"HTTP {response.status_code}")
+                print(f"OpenAI API error: {response.status_code}")
+                return None
             
         except Exception as e:
             print(f"OpenAI API error: {e}")
             return None
     
-    def _call_anthropic_api(self, prompt: str) -> Optional[str]:
+    def _call_anthropic_api(self, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                            json_output: bool = False, priority: Optional[int] = None) -> Optional[str]:
         """Call Anthropic Claude API"""
         try:
             if not self.anthropic_key:
                 return None
             
+            cache_key = self.response_cache.make_key(
+                prompt, self.anthropic_model, market_state, system=self.system_prompt,
+                max_tokens=max_tokens, json_output=json_output
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             headers = {
-                'Authorization': f'Bearer {self.anthropic_key}',
+                'x-api-key': self.anthropic_key,
+                'anthropic-version': '2023-06-01',
                 'Content-Type': 'application/json'
             }
             
+            messages = [{'role': 'user', 'content': prompt}]
+            if json_output:
+                # Prefilling the opening brace keeps Claude to a bare JSON object
+                messages.append({'role': 'assistant', 'content': '{'})
+            
             data = {
-                'model': 'claude-3-sonnet-20240229',
-                'messages': [{'role': 'user', 'content': prompt}],
-                'max_tokens': 500
+                'model': self.anthropic_model,
+                'system': self.system_prompt,
+                'messages': messages,
+                'max_tokens': max_tokens
             }
             
-            response = requests.post(
-                'https://api.anthropic.com/v1/messages',
-                headers=headers,
-                json=data,
-                timeout=30
-            )
+            priority = self.default_priority if priority is None else priority
+            with self.governor.slot('anthropic', priority) as granted:
+                if not granted:
+                    return self._degraded_reply('anthropic', cache_key)
+                started = time.time()
+                try:
+                    response = requests.post(
+                        f'{self.anthropic_base_url}/messages',
+                        headers=headers,
+                        json=data,
+                        timeout=30
+                    )
+                except Exception as e:
+                    self._record_call('anthropic', started, False, error=str(e))
+                    raise
             
             if response.status_code == 200:
-                return response.json()['content'][0]['text']
+                body = response.json()
+                usage = body.get('usage', {})
+                content = body['content'][0]['text']
+                self._record_call('anthropic', started, True,
+                                  usage.get('input_tokens') or self.context_builder.count(self.system_prompt + prompt),
+                                  usage.get('output_tokens') or self.context_builder.count(content))
+                if json_output:
+                    content = '{' + content
+                self.response_cache.set(cache_key, content)
+                return content
             else:
+                self._record_call('anthropic', started, False, error=f"HTTP {response.status_code}")
                 print(f"Anthropic API error: {response.status_code}")
                 return None
                 
         except Exception as e:
             print(f"Anthropic API error: {e}")
             return None
+    
+    def _stream_llm(self, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                    objective: Optional[str] = None, priority: Optional[int] = None):
+        """Stream tokens from the best provider, failing over only if nothing was sent yet"""
+        priority = self.default_priority if priority is None else priority
+        for provider in self.router.rank(self._configured_providers(), objective):
+            sent = False
+            try:
+                for token in self._stream_provider(provider, prompt, max_tokens, market_state, priority):
+                    sent = True
+                    yield token
+                if sent:
+                    return
+            except Exception as e:
+                print(f"{provider} stream error: {e}")
+                if sent:
+                    return
+    
+    def _stream_provider(self, provider: str, prompt: str, max_tokens: int = 500,
+                         market_state: Optional[dict] = None, priority: Optional[int] = None):
+        if provider == 'anthropic':
+            return self._stream_anthropic_api(prompt, max_tokens, market_state, priority)
+        if provider == 'openai':
+            return self._stream_openai_api(prompt, max_tokens, market_state, priority)
+        return iter(())
+    
+    def _iter_sse_data(self, response):
+        """Yield the decoded JSON payload of each server-sent 'data:' line"""
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            payload = line[5:].strip()
+            if payload == '[DONE]':
+                return
+            try:
+                yield json.loads(payload)
+            except json.JSONDecodeError:
+                continue
+    
+    def _stream_openai_api(self, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                           priority: Optional[int] = None):
+        """Stream an OpenAI chat completion token by token"""
+        if not self.api_key:
+            return
+        
+        cache_key = self.response_cache.make_key(
+            prompt, self.openai_model, market_state, system=self.system_prompt,
+            max_tokens=max_tokens, json_output=False
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        data = {
+            'model': self.openai_model,
+            'messages': [
+                {'role': 'system', 'content': self.system_prompt},
+                {'role': 'user', 'content': prompt}
+            ],
+            'max_tokens': max_tokens,
+            'temperature': 0.7,
+            'stream': True,
+            'stream_options': {'include_usage': True}
+        }
+        
+        priority = self.default_priority if priority is None else priority
+        with self.governor.slot('openai', priority) as granted:
+            if not granted:
+                stale = self._degraded_reply('openai', cache_key)
+                if stale is not None:
+                    yield stale
+                return
+            
+            started = time.time()
+            parts, usage = [], {}
+            try:
+                with requests.post(f'{self.openai_base_url}/chat/completions', headers=headers,
+                                   json=data, timeout=30, stream=True) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"HTTP {response.status_code}")
+                    for event in self._iter_sse_data(response):
+                        usage = event.get('usage') or usage
+                        for choice in event.get('choices', []):
+                            token = (choice.get('delta') or {}).get('content')
+                            if token:
+                                parts.append(token)
+                                yield token
+            except Exception as e:
+                self._record_call('openai', started, False, error=str(e))
+                raise
+        
+        content = ''.join(parts).strip()
+        self._record_call('openai', started, True,
+                          usage.get('prompt_tokens') or self.context_builder.count(self.system_prompt + prompt),
+                          usage.get('completion_tokens') or self.context_builder.count(content))
+        self.response_cache.set(cache_key, content)
+    
+    def _stream_anthropic_api(self, prompt: str, max_tokens: int = 500, market_state: Optional[dict] = None,
+                              priority: Optional[int] = None):
+        """Stream a Claude message token by token"""
+        if not self.anthropic_key:
+            return
+        
+        cache_key = self.response_cache.make_key(
+            prompt, self.anthropic_model, market_state, system=self.system_prompt,
+            max_tokens=max_tokens, json_output=False
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        headers = {
+            'x-api-key': self.anthropic_key,
+            'anthropic-version': '2023-06-01',
+            'Content-Type': 'application/json'
+        }
+        data = {
+            'model': self.anthropic_model,
+            'system': self.system_prompt,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'max_tokens': max_tokens,
+            'stream': True
+        }
+        
+        priority = self.default_priority if priority is None else priority
+        with self.governor.slot('anthropic', priority) as granted:
+            if not granted:
+                stale = self._degraded_reply('anthropic', cache_key)
+                if stale is not None:
+                    yield stale
+                return
+            
+            started = time.time()
+            parts, input_tokens, output_tokens = [], 0, 0
+            try:
+                with requests.post(f'{self.anthropic_base_url}/messages', headers=headers,
+                                   json=data, timeout=30, stream=True) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"HTTP {response.status_code}")
+                    for event in self._iter_sse_data(response):
+                        kind = event.get('type')
+                        if kind == 'message_start':
+                            input_tokens = event.get('message', {}).get('usage', {}).get('input_tokens', 0)
+                        elif kind == 'content_block_delta':
+                            token = event.get('delta', {}).get('text')
+                            if token:
+                                parts.append(token)
+                                yield token
+                        elif kind == 'message_delta':
+                            output_tokens = event.get('usage', {}).get('output_tokens', output_tokens)
+                        elif kind == 'error':
+                            raise RuntimeError(event.get('error', {}).get('message', 'stream error'))
+            except Exception as e:
+                self._record_call('anthropic', started, False, error=str(e))
+                raise
+        
+        content = ''.join(parts)
+        self._record_call('anthropic', started, True,
+                          input_tokens or self.context_builder.count(self.system_prompt + prompt),
+                          output_tokens or self.context_builder.count(content))
+        self.response_cache.set(cache_key, content)
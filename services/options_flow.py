@@ -0,0 +1,185 @@
+import threading
+import numpy as np
+import pandas as pd
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+# Equity options are quoted per share on 100-share contracts
+CONTRACT_MULTIPLIER = 100
+# Expiration dates are exchange (New York) calendar dates
+MARKET_TZ = ZoneInfo('America/New_York')
+
+
+class OptionsFlowDetector:
+    """Flags unusual options activity from successive chain snapshots.
+
+    State is kept per (symbol, expiration) as a frame indexed by contract
+    symbol, so each new snapshot is joined against only its own previous
+    snapshot through an index lookup instead of rescanning everything seen.
+    Expirations are dropped once their date has passed.
+    """
+
+    def __init__(self,
+                 volume_oi_ratio: float = 1.0,
+                 min_volume: int = 500,
+                 premium_spike_multiple: float = 5.0,
+                 min_spike_premium: float = 25000,
+                 sweep_min_strikes: int = 3,
+                 min_sweep_premium: float = 10000,
+                 premium_ewma_alpha: float = 0.2,
+                 max_alerts: int = 500):
+        self.volume_oi_ratio = volume_oi_ratio
+        self.min_volume = min_volume
+        self.premium_spike_multiple = premium_spike_multiple
+        self.min_spike_premium = min_spike_premium
+        self.sweep_min_strikes = sweep_min_strikes
+        self.min_sweep_premium = min_sweep_premium
+        self.premium_ewma_alpha = premium_ewma_alpha
+
+        self._snapshots: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.alerts = deque(maxlen=max_alerts)
+
+    def update(self, symbol: str, chain: pd.DataFrame) -> List[Dict]:
+        """Ingest one chain snapshot and return the flow rows that traded since the last one.
+
+        The first snapshot of a contract only records its volume; flow starts with the next one.
+        """
+        if chain is None or chain.empty:
+            return []
+
+        flow = []
+        for expiration, expiry_chain in chain.groupby('expiration', sort=False):
+            flow.extend(self._update_expiration(symbol, expiration, expiry_chain))
+        self.prune_expired()
+        return flow
+
+    def prune_expired(self, today: Optional[str] = None) -> int:
+        """Forget snapshots of expirations before today (YYYY-MM-DD, New York); returns how many"""
+        today = today or datetime.now(MARKET_TZ).date().isoformat()
+        with self._lock:
+            expired = [key for key in self._snapshots if str(key[1]) < today]
+            for key in expired:
+                del self._snapshots[key]
+        return len(expired)
+
+    def _update_expiration(self, symbol: str, expiration: str, chain: pd.DataFrame) -> List[Dict]:
+        current = chain.drop_duplicates('contractSymbol').set_index('contractSymbol')
+        key = (symbol, expiration)
+
+        with self._lock:
+            previous = self._snapshots.get(key)
+
+        volume = current['volume'].fillna(0).to_numpy(dtype=float)
+        open_interest = current['openInterest'].fillna(0).to_numpy(dtype=float)
+        price = self._contract_price(current)
+
+        if previous is not None:
+            prior = previous.reindex(current.index)
+            prev_volume = prior['volume'].to_numpy(dtype=float)
+            prev_avg = prior['premium_avg'].to_numpy(dtype=float)
+        else:
+            prev_volume = np.full(len(current), np.nan)
+            prev_avg = np.full(len(current), np.nan)
+
+        seen = ~np.isnan(prev_volume)
+        # Volume is cumulative for the session; a drop means a new session started.
+        # A contract's first snapshot is only a baseline: its volume traded before we looked.
+        traded = np.where(seen, np.where(volume >= prev_volume, volume - prev_volume, volume), 0.0)
+        premium = traded * price * CONTRACT_MULTIPLIER
+
+        # Alert when day volume crosses the OI threshold, not on every later trade above it
+        oi_floor = self.volume_oi_ratio * np.maximum(open_interest, 1)
+        prior_day_volume = np.where(seen & (volume >= prev_volume), prev_volume, 0.0)
+        above = (volume >= self.min_volume) & (volume > oi_floor)
+        was_above = (prior_day_volume >= self.min_volume) & (prior_day_volume > oi_floor)
+        volume_over_oi = above & ~was_above
+        premium_spike = (
+            seen & (prev_avg > 0) & (premium >= self.min_spike_premium)
+            & (premium >= self.premium_spike_multiple * prev_avg)
+        )
+        sweep = self._detect_sweeps(current, premium)
+
+        alpha = self.premium_ewma_alpha
+        premium_avg = np.where(
+            seen & ~np.isnan(prev_avg),
+            alpha * premium + (1 - alpha) * prev_avg,
+            np.where(seen, premium, np.nan)
+        )
+
+        with self._lock:
+            self._snapshots[key] = pd.DataFrame(
+                {'volume': volume, 'premium_avg': premium_avg},
+                index=current.index
+            )
+
+        active = np.flatnonzero(traded > 0)
+        if active.size == 0:
+            return []
+
+        rows = current.iloc[active]
+        iv = rows['iv'] if 'iv' in rows else rows.get('impliedVolatility', pd.Series(np.nan, index=rows.index))
+        timestamp = datetime.now().isoformat()
+        flow = []
+
+        for i, (contract, row) in zip(active, rows.iterrows()):
+            reasons = []
+            if volume_over_oi[i]:
+                reasons.append('VOLUME_OVER_OI')
+            if premium_spike[i]:
+                reasons.append('PREMIUM_SPIKE')
+            if sweep[i]:
+                reasons.append('SWEEP')
+
+            contract_iv = iv.loc[contract]
+            item = {
+                'contract': contract,
+                'symbol': symbol,
+                'strike': str(row['strike']),
+                'expiry': expiration,
+                'type': row['option_type'],
+                'volume': int(traded[i]),
+                'dayVolume': int(volume[i]),
+                'premium': round(float(premium[i]), 2),
+                'price': round(float(price[i]), 2),
+                'unusual': bool(reasons),
+                'reasons': reasons,
+                'openInterest': int(open_interest[i]),
+                'impliedVolatility': round(float(contract_iv), 4) if pd.notna(contract_iv) else None,
+                'timestamp': timestamp
+            }
+            flow.append(item)
+            if reasons:
+                self.alerts.append(item)
+
+        return flow
+
+    def _detect_sweeps(self, current: pd.DataFrame, premium: np.ndarray) -> np.ndarray:
+        """Mark contracts where heavy premium hit several strikes of the same side at once"""
+        heavy = premium >= self.min_sweep_premium
+        if heavy.sum() < self.sweep_min_strikes:
+            return np.zeros(len(current), dtype=bool)
+
+        side = current['option_type'].to_numpy()
+        strikes_hit = pd.Series(heavy.astype(int)).groupby(side).transform('sum').to_numpy()
+        return heavy & (strikes_hit >= self.sweep_min_strikes)
+
+    def _contract_price(self, current: pd.DataFrame) -> np.ndarray:
+        """Mid price when both sides are quoted, last trade otherwise"""
+        bid = current['bid'].fillna(0).to_numpy(dtype=float)
+        ask = current['ask'].fillna(0).to_numpy(dtype=float)
+        last = current['lastPrice'].fillna(0).to_numpy(dtype=float)
+        quoted = (bid > 0) & (ask >= bid)
+        return np.where(quoted, 0.5 * (bid + ask), last)
+
+    def get_recent_alerts(self, limit: int = 50, symbol: Optional[str] = None) -> List[Dict]:
+        """Get the most recent unusual-activity alerts"""
+        alerts = [a for a in reversed(self.alerts) if symbol is None or a['symbol'] == symbol]
+        return alerts[:limit]
+
+    def tracked_contracts(self) -> int:
+        """Number of contracts with a stored snapshot"""
+        with self._lock:
+            return sum(len(snapshot) for snapshot in self._snapshots.values())
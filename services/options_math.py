@@ -0,0 +1,210 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+
+# Calendar conventions used across the options path
+DAYS_PER_YEAR = 365.0
+DEFAULT_RISK_FREE_RATE = 0.05
+# Expirations settle at the 16:00 close in New York
+MARKET_TZ = ZoneInfo('America/New_York')
+
+# Implied volatility search bounds
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+def _norm_pdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal density"""
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF via a Chebyshev erfc fit (relative error < 1.2e-7, tails included)"""
+    z = np.abs(np.asarray(x, dtype=float)) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def _as_arrays(*values):
+    """Broadcast scalars and sequences to float arrays of a common shape"""
+    return np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+
+
+def _d1_d2(spot, strike, t, rate, sigma, dividend_yield):
+    sqrt_t = np.sqrt(t)
+    vol_sqrt_t = sigma * sqrt_t
+    d1 = (np.log(spot / strike) + (rate - dividend_yield + 0.5 * sigma * sigma) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t, sqrt_t
+
+
+def bs_price(spot, strike, t, rate, sigma, is_call, dividend_yield=0.0) -> np.ndarray:
+    """Black-Scholes price for arrays of European options"""
+    spot, strike, t, rate, sigma, dividend_yield = _as_arrays(spot, strike, t, rate, sigma, dividend_yield)
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), spot.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2, _ = _d1_d2(spot, strike, t, rate, sigma, dividend_yield)
+        disc_spot = spot * np.exp(-dividend_yield * t)
+        disc_strike = strike * np.exp(-rate * t)
+        call = disc_spot * _norm_cdf(d1) - disc_strike * _norm_cdf(d2)
+        put = disc_strike * _norm_cdf(-d2) - disc_spot * _norm_cdf(-d1)
+
+    return np.where(is_call, call, put)
+
+
+def bs_greeks(spot, strike, t, rate, sigma, is_call, dividend_yield=0.0) -> Dict[str, np.ndarray]:
+    """Delta, gamma, vega (per 1 vol point) and theta (per calendar day) for arrays of options"""
+    spot, strike, t, rate, sigma, dividend_yield = _as_arrays(spot, strike, t, rate, sigma, dividend_yield)
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), spot.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2, sqrt_t = _d1_d2(spot, strike, t, rate, sigma, dividend_yield)
+        div_disc = np.exp(-dividend_yield * t)
+        rate_disc = np.exp(-rate * t)
+        pdf_d1 = _norm_pdf(d1)
+        cdf_d1 = _norm_cdf(d1)
+        cdf_d2 = _norm_cdf(d2)
+
+        delta = np.where(is_call, div_disc * cdf_d1, div_disc * (cdf_d1 - 1.0))
+        gamma = div_disc * pdf_d1 / (spot * sigma * sqrt_t)
+        vega = spot * div_disc * pdf_d1 * sqrt_t
+
+        decay = -spot * div_disc * pdf_d1 * sigma / (2.0 * sqrt_t)
+        call_theta = decay - rate * strike * rate_disc * cdf_d2 + dividend_yield * spot * div_disc * cdf_d1
+        put_theta = decay + rate * strike * rate_disc * (1.0 - cdf_d2) - dividend_yield * spot * div_disc * (1.0 - cdf_d1)
+        theta = np.where(is_call, call_theta, put_theta)
+
+    return {
+        'delta': delta,
+        'gamma': gamma,
+        'vega': vega / 100.0,
+        'theta': theta / DAYS_PER_YEAR
+    }
+
+
+def implied_volatility(price, spot, strike, t, rate, is_call, dividend_yield=0.0,
+                       tol: float = 1e-6, max_iter: int = 50) -> np.ndarray:
+    """Solve Black-Scholes implied volatility for a whole chain at once.
+
+    In-the-money quotes are mapped to the out-of-the-money side through
+    put-call parity, where the price carries all of the volatility
+    information. Each contract then runs a safeguarded Newton iteration:
+    it keeps a [lo, hi] bracket on sigma, takes the Newton step when it
+    lands inside the bracket and falls back to bisection otherwise.
+    Contracts priced outside the no-arbitrage bounds, or that fail to
+    converge, come back as NaN.
+    """
+    price, spot, strike, t, rate, dividend_yield = _as_arrays(price, spot, strike, t, rate, dividend_yield)
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    shape = price.shape
+    price, spot, strike, t, rate, dividend_yield, is_call = (
+        a.ravel() for a in (price, spot, strike, t, rate, dividend_yield, is_call)
+    )
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        disc_spot = spot * np.exp(-dividend_yield * t)
+        disc_strike = strike * np.exp(-rate * t)
+        forward_gap = disc_spot - disc_strike
+        in_the_money = np.where(is_call, forward_gap > 0, forward_gap < 0)
+        otm_price = np.where(in_the_money, np.where(is_call, price - forward_gap, price + forward_gap), price)
+        otm_call = is_call ^ in_the_money
+        upper = np.where(otm_call, disc_spot, disc_strike)
+
+    valid = (
+        np.isfinite(otm_price) & (otm_price > 0) & (otm_price < upper)
+        & (spot > 0) & (strike > 0) & (t > 0)
+    )
+
+    result = np.full(price.shape, np.nan)
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return result.reshape(shape)
+
+    p, s, k, tt, r, q, c = otm_price[idx], spot[idx], strike[idx], t[idx], rate[idx], dividend_yield[idx], otm_call[idx]
+    lo = np.full(idx.size, MIN_VOL)
+    hi = np.full(idx.size, MAX_VOL)
+
+    # Brenner-Subrahmanyam seed, clipped into the bracket
+    sigma = np.clip(np.sqrt(2.0 * np.pi / tt) * p / s, 0.05, 2.0)
+    done = np.zeros(idx.size, dtype=bool)
+    active = np.arange(idx.size)
+
+    for _ in range(max_iter):
+        sg = sigma[active]
+        s_a, k_a, t_a, r_a, q_a = s[active], k[active], tt[active], r[active], q[active]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            diff = bs_price(s_a, k_a, t_a, r_a, sg, c[active], q_a) - p[active]
+            d1, _, sqrt_t = _d1_d2(s_a, k_a, t_a, r_a, sg, q_a)
+            vega = s_a * np.exp(-q_a * t_a) * _norm_pdf(d1) * sqrt_t
+
+        # Price is increasing in sigma, so the sign of the error tightens the bracket
+        l_a = np.where(diff < 0, sg, lo[active])
+        h_a = np.where(diff > 0, sg, hi[active])
+        lo[active], hi[active] = l_a, h_a
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = sg - diff / vega
+        use_newton = np.isfinite(newton) & (newton > l_a) & (newton < h_a)
+        step = np.where(use_newton, newton, 0.5 * (l_a + h_a))
+        sigma[active] = step
+
+        converged = (np.abs(step - sg) < tol) | (diff == 0)
+        done[active[converged]] = True
+        active = active[~converged]
+        if active.size == 0:
+            break
+
+    sigma[~done] = np.nan
+    # Quotes pinned to the bracket edges carry no usable volatility information
+    sigma[(sigma <= MIN_VOL * (1 + 1e-6)) | (sigma >= MAX_VOL * (1 - 1e-6))] = np.nan
+    result[idx] = sigma
+    return result.reshape(shape)
+
+
+def year_fraction(expiration: str, now: Optional[datetime] = None) -> float:
+    """Years from now until a YYYY-MM-DD expiration at the 16:00 New York close.
+
+    A naive `now` is read as New York time.
+    """
+    now = now or datetime.now(MARKET_TZ)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=MARKET_TZ)
+    expiry = datetime.strptime(expiration, '%Y-%m-%d').replace(hour=16, tzinfo=MARKET_TZ)
+    return max((expiry - now).total_seconds(), 0.0) / (DAYS_PER_YEAR * 86400.0)
+
+
+def analyze_chain(chain: pd.DataFrame, spot: float, t: float,
+                  rate: float = DEFAULT_RISK_FREE_RATE, dividend_yield: float = 0.0) -> pd.DataFrame:
+    """Add implied volatility and Greeks columns to an option chain.
+
+    Expects yfinance-style columns (strike, bid, ask, lastPrice) plus an
+    'option_type' column of 'CALL'/'PUT'. Mid price is used when both sides
+    are quoted, last trade otherwise.
+    """
+    df = chain.copy()
+    if df.empty:
+        return df
+
+    strike = df['strike'].to_numpy(dtype=float)
+    bid = df['bid'].to_numpy(dtype=float) if 'bid' in df else np.zeros(len(df))
+    ask = df['ask'].to_numpy(dtype=float) if 'ask' in df else np.zeros(len(df))
+    last = df['lastPrice'].to_numpy(dtype=float) if 'lastPrice' in df else np.full(len(df), np.nan)
+    is_call = (df['option_type'].str.upper() == 'CALL').to_numpy()
+
+    quoted = (bid > 0) & (ask > 0) & (ask >= bid)
+    price = np.where(quoted, 0.5 * (bid + ask), last)
+
+    iv = implied_volatility(price, spot, strike, t, rate, is_call, dividend_yield)
+    greeks = bs_greeks(spot, strike, t, rate, iv, is_call, dividend_yield)
+
+    df['mid_price'] = price
+    df['iv'] = iv
+    for name, values in greeks.items():
+        df[name] = values
+    return df
@@ -10,14 +10,31 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from .market_data import MarketDataService
 from .openai_service import OpenAIService
+from .llm_governor import PRIORITY_BATCH
+from .correlation import RollingCorrelation
 
 class ScannerService:
-    def __init__(self):
-        self.market_data_service = MarketDataService()
+    def __init__(self, market_data_service: Optional[MarketDataService] = None):
+        self.market_data_service = market_data_service or MarketDataService()
         self.openai_service = OpenAIService()
         self.is_scanning = False
         self.scan_interval = 300  # 5 minutes
         
+        # Popular trading symbols
+        self.scan_symbols = [
+            'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX',
+            'AMD', 'ADBE', 'CRM', 'ORCL', 'INTC', 'CSCO', 'IBM', 'HPQ',
+            'SPY', 'QQQ', 'IWM', 'VTI', 'VOO', 'ARKK', 'SOXL', 'TQQQ',
+            'PLTR', 'BB', 'GME', 'AMC', 'BBBY', 'ATER', 'MULN', 'SNDL'
+        ]
+        
+        # Collapse signals from symbols moving together (SPY/QQQ/VOO/TQQQ...). The engine is
+        # fed completed hourly closes only, so every return it sees spans the same interval
+        self.correlation = RollingCorrelation(halflife=100)
+        self.correlation_threshold = 0.85
+        self.correlation_bar = pd.Timedelta(hours=1)
+        self.correlation_last_bar = None
+        
     def start_periodic_scanning(self):
         """Start periodic market scanning"""
         def scan_loop():
@@ -42,15 +59,10 @@ class ScannerService:
         try:
             print("🔍 Starting comprehensive market scan...")
             
-            # Popular trading symbols
-            symbols = [
-                'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX',
-                'AMD', 'ADBE', 'CRM', 'ORCL', 'INTC', 'CSCO', 'IBM', 'HPQ',
-                'SPY', 'QQQ', 'IWM', 'VTI', 'VOO', 'ARKK', 'SOXL', 'TQQQ',
-                'PLTR', 'BB', 'GME', 'AMC', 'BBBY', 'ATER', 'MULN', 'SNDL'
-            ]
+            symbols = self.scan_symbols
             
             scan_results = []
+            self._update_correlation(symbols)
             
             for symbol in symbols:
                 try:
@@ -69,16 +81,53 @@ class ScannerService:
                     print(f"Error scanning {symbol}: {e}")
                     continue
             
-            # Sort by signal strength
+            # Sort by signal strength, then keep the strongest of each correlated group
             scan_results.sort(key=lambda x: x.get('analysis', {}).get('signal_strength', 0), reverse=True)
+            scan_results = self.correlation.collapse(scan_results, self.correlation_threshold)[:20]  # Top 20
+            self._add_ai_commentary(scan_results)
             
             print(f"✅ Scan complete. Found {len(scan_results)} signals")
-            return scan_results[:20]  # Return top 20
+            return scan_results
             
         except Exception as e:
             print(f"Scan error: {e}")
             return []
     
+    def _add_ai_commentary(self, results: List[Dict]):
+        """Attach model commentary to scan results with batched calls"""
+        if not results:
+            return
+        try:
+            commentary = self.openai_service.analyze_symbols_batch(results, objective='cost', priority=PRIORITY_BATCH)
+            for result in results:
+                if commentary.get(result.get('symbol')):
+                    result['ai_commentary'] = commentary[result['symbol']]
+        except Exception as e:
+            print(f"AI commentary error: {e}")
+    
+    def _update_correlation(self, symbols: List[str]):
+        """Feed the correlation engine the hourly bars completed since the last update (a month at first)"""
+        now = pd.Timestamp.now(tz='UTC')
+        if self.correlation_last_bar is not None and now < self.correlation_last_bar + 2 * self.correlation_bar:
+            return
+        try:
+            period = '1mo' if self.correlation_last_bar is None else '5d'
+            bars = yf.download(symbols, period=period, interval='1h', group_by='column',
+                               auto_adjust=False, threads=True, progress=False)
+            if bars.empty:
+                return
+            closes = bars['Close']
+            closes.index = closes.index.tz_localize('UTC') if closes.index.tz is None else closes.index.tz_convert('UTC')
+            # Bars are stamped with their start; the one still forming would be a shorter return
+            closes = closes[closes.index + self.correlation_bar <= now]
+            if self.correlation_last_bar is not None:
+                closes = closes[closes.index > self.correlation_last_bar]
+            if not closes.empty:
+                self.correlation.seed_from_prices(closes)
+                self.correlation_last_bar = closes.index[-1]
+        except Exception as e:
+            print(f"Correlation update error: {e}")
+    
     def pre_market_scan(self, period: str = 'today') -> List[Dict]:
         """Enhanced pre-market scanner with trade analysis"""
         try:
@@ -108,13 +157,12 @@ class ScannerService:
                     # Apply pre-market criteria
                     change_percent = abs(stock_data.get('change_percent', 0))
                     price = stock_data.get('price', 0)
-                    volume = stock_data.get('volume', 0)
-                    avg_volume = stock_data.get('avg_volume', 1)
+                    volume_ratio = self.market_data_service.get_volume_ratio(stock_data)
                     
                     # Pre-market filters
                     if (change_percent >= 2.0 and  # Min 2% movement
                         1 <= price <= 20 and      # Price range $1-20
-                        volume > avg_volume * 1.5): # Volume > 1.5x avg
+                        volume_ratio > 1.5):      # Volume > 1.5x expected
                         
                         # Get additional data for analysis
                         market_cap = stock_data.get('market_cap', 0)
@@ -126,7 +174,7 @@ class ScannerService:
                         result = {
                             **stock_data,
                             'float_shares': float_shares,
-                            'volume_ratio': volume / max(avg_volume, 1),
+                            'volume_ratio': volume_ratio,
                             'momentum_score': self._calculate_momentum_score(stock_data),
                             'trade_analysis': trade_analysis,
                             'scan_period': period,
@@ -157,9 +205,7 @@ class ScannerService:
             symbol = stock_data.get('symbol', '')
             price = stock_data.get('price', 0)
             change_percent = stock_data.get('change_percent', 0)
-            volume = stock_data.get('volume', 0)
-            avg_volume = stock_data.get('avg_volume', 1)
-            volume_ratio = volume / max(avg_volume, 1)
+            volume_ratio = self.market_data_service.get_volume_ratio(stock_data)
             
             # Determine strategy based on characteristics
             strategy = self._classify_strategy(float_shares, volume_ratio, abs(change_percent))
@@ -291,9 +337,7 @@ class ScannerService:
     def _calculate_momentum_score(self, stock_data: dict) -> float:
         """Calculate momentum score for ranking"""
         change_percent = abs(stock_data.get('change_percent', 0))
-        volume = stock_data.get('volume', 0)
-        avg_volume = stock_data.get('avg_volume', 1)
-        volume_ratio = volume / max(avg_volume, 1)
+        volume_ratio = self.market_data_service.get_volume_ratio(stock_data)
         
         # Volume Impact Score = Change% * Volume Ratio
         return change_percent * volume_ratio
@@ -393,10 +437,13 @@ class ScannerService:
             sma_5 = np.mean(closes[-5:])
             sma_10 = np.mean(closes[-10:])
             
-            # Volume analysis
-            avg_volume = np.mean(volumes[-10:])
-            current_volume = data.get('volume', 0)
-            volume_ratio = current_volume / max(avg_volume, 1)
+            # Volume analysis: time-of-day RVOL when a profile exists, else last bar vs 10-bar mean
+            if data.get('rvol') is not None:
+                volume_ratio = data['rvol']
+            else:
+                avg_volume = np.mean(volumes[-10:])
+                current_volume = data.get('volume', 0)
+                volume_ratio = current_volume / max(avg_volume, 1)
             
             # Price momentum
             price_change = data.get('change_percent', 0)
@@ -0,0 +1,141 @@
+import re
+import numpy as np
+from typing import Dict, Iterable, List, Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+NEGATORS = ['not', 'no', 'never', 'without', 'neither', 'nor', 'cannot', 'fail', 'fails', 'failed',
+            "don't", "doesn't", "didn't", "isn't", "wasn't", "aren't", "weren't", "won't", "can't",
+            "hasn't", "haven't", "hadn't", "wouldn't", "couldn't", "shouldn't"]
+
+
+class LexiconScorer:
+    """Weighted-lexicon sentiment for many headlines at once.
+
+    Texts are tokenized once and every lexicon hit becomes an entry
+    (row, token position, term) of a sparse headline-by-term matrix in
+    coordinate form; scores are that matrix times the term weight vector,
+    a single np.bincount. A hit up to `negation_window` tokens after a negator
+    ("not", "fails", "won't", ...) in the same headline counts with its sign
+    flipped. Phrases ("raises guidance") match on whole tokens.
+    """
+
+    def __init__(self, weights: Dict[str, float], negators: Iterable[str] = NEGATORS,
+                 negation_window: int = 3):
+        self.negation_window = negation_window
+        self._ids: Dict[str, int] = {}
+        self._phrases: Dict[int, List[tuple]] = {}
+        weight_list = []
+
+        def term_id(token):
+            if token not in self._ids:
+                self._ids[token] = len(weight_list)
+                weight_list.append(0.0)
+            return self._ids[token]
+
+        for term, weight in weights.items():
+            tokens = _TOKEN_RE.findall(term.lower())
+            if not tokens:
+                continue
+            phrase_id = term_id(' '.join(tokens))
+            weight_list[phrase_id] = float(weight)
+            if len(tokens) > 1:
+                # The first word stands in as a zero-weight entry whose row is checked for the rest
+                self._phrases.setdefault(term_id(tokens[0]), []).append((tuple(tokens[1:]), phrase_id))
+        negator_ids = [term_id(token) for token in negators]
+
+        self.weights = np.array(weight_list, dtype=float)
+        self._is_negator = np.zeros(len(weight_list), dtype=bool)
+        self._is_negator[negator_ids] = True
+
+    @classmethod
+    def from_lexicon(cls, lexicon: Dict, **kwargs) -> 'LexiconScorer':
+        """From {'positive': terms, 'negative': terms}; a list weighs each term 1, a {term: weight} dict sets weights"""
+        weights = {}
+        for polarity, sign in (('positive', 1.0), ('negative', -1.0)):
+            terms = lexicon.get(polarity, [])
+            if isinstance(terms, dict):
+                weights.update({term: sign * abs(float(w)) for term, w in terms.items()})
+            else:
+                weights.update({term: sign for term in terms})
+        return cls(weights, **kwargs)
+
+    def _entries(self, texts: Sequence[str]):
+        """(rows, positions, term ids) of every lexicon and negator hit, ordered by row then position"""
+        lookup = self._ids.get
+        rows, positions, terms = [], [], []
+        for row, text in enumerate(texts):
+            if not text:
+                continue
+            tokens = _TOKEN_RE.findall(text.lower().replace('’', "'"))
+            for position, token in enumerate(tokens):
+                term = lookup(token)
+                if term is None:
+                    continue
+                rows.append(row)
+                positions.append(position)
+                terms.append(term)
+                for rest, phrase_id in self._phrases.get(term, ()):
+                    if tuple(tokens[position + 1:position + 1 + len(rest)]) == rest:
+                        rows.append(row)
+                        positions.append(position)
+                        terms.append(phrase_id)
+        return (np.array(rows, dtype=np.int64), np.array(positions, dtype=np.int64),
+                np.array(terms, dtype=np.int64))
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        """Net sentiment per text: sum of matched term weights, negated hits flipped"""
+        rows, positions, terms = self._entries(texts)
+        if not len(terms):
+            return np.zeros(len(texts))
+
+        # Index of the closest negator entry at or before each entry
+        is_negator = self._is_negator[terms]
+        index = np.arange(len(terms))
+        last_negator = np.maximum.accumulate(np.where(is_negator, index, -1))
+        source = np.maximum(last_negator, 0)
+        negated = ((last_negator >= 0) & (last_negator != index) & (rows[source] == rows)
+                   & (positions - positions[source] <= self.negation_window))
+
+        values = self.weights[terms] * np.where(negated, -1.0, 1.0)
+        return np.bincount(rows, weights=values, minlength=len(texts))
+
+    def score_one(self, text: str) -> Dict:
+        return self.labels(self.score([text]))[0]
+
+    @staticmethod
+    def labels(scores: np.ndarray) -> List[Dict]:
+        """{'sentiment', 'score'} per score, the shape news items carry"""
+        names = np.where(scores > 0, 'positive', np.where(scores < 0, 'negative', 'neutral'))
+        return [{'sentiment': str(name), 'score': round(float(score), 2)} for name, score in zip(names, scores)]
+
+
+def aggregate_by_symbol(scores: Sequence[float], symbols: Sequence[Iterable[str]]) -> Dict[str, Dict]:
+    """Per-symbol headline count, mean/net score and positive/negative counts.
+
+    `symbols[i]` are the tickers tagged on the headline scored `scores[i]`;
+    a headline counts once for each of its symbols.
+    """
+    scores = np.asarray(scores, dtype=float)
+    lengths = np.fromiter((len(s) for s in symbols), dtype=np.int64, count=len(symbols))
+    flat = [symbol for item_symbols in symbols for symbol in item_symbols]
+    if not flat:
+        return {}
+    names, inverse = np.unique(np.array(flat), return_inverse=True)
+    per_entry = np.repeat(scores, lengths)
+
+    count = np.bincount(inverse, minlength=len(names))
+    net = np.bincount(inverse, weights=per_entry, minlength=len(names))
+    positive = np.bincount(inverse, weights=per_entry > 0, minlength=len(names))
+    negative = np.bincount(inverse, weights=per_entry < 0, minlength=len(names))
+    return {
+        str(name): {
+            'count': int(count[i]),
+            'net_score': round(float(net[i]), 2),
+            'mean_score': round(float(net[i] / count[i]), 3),
+            'positive': int(positive[i]),
+            'negative': int(negative[i])
+        }
+        for i, name in enumerate(names)
+    }
+
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Optional
+
+
+def stable_hash(*parts) -> str:
+    """Content hash that is identical in every process (unlike the salted built-in hash())"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def stable_int(text: str) -> int:
+    """Deterministic non-negative integer for seeding rule-based fallbacks"""
+    return int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'big')
+
+
+class SharedAnalysisCache:
+    """SQLite-backed JSON cache shared by every worker process on the host.
+
+    WAL mode lets readers in all workers proceed while one writes, so a result
+    computed by any worker is a local-disk read away for the rest. Without a
+    path, or when the database cannot be set up, nothing is cached and
+    get_or_compute simply computes.
+    """
+
+    def __init__(self, path: Optional[str] = 'data/analysis_cache.db', ttl: float = 300, purge_every: int = 500):
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.path:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._connection().execute(
+                    'CREATE TABLE IF NOT EXISTS analysis_cache '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)'
+                )
+            except Exception as e:
+                print(f"Analysis cache setup error, caching disabled: {e}")
+                self.path = None
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.path:
+            return None
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM analysis_cache WHERE key = ? AND expires >= ?', (key, time.time())
+            ).fetchone()
+        except Exception as e:
+            print(f"Analysis cache read error: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if not self.path:
+            return
+        expires = time.time() + (ttl if ttl is not None else self.ttl)
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?)',
+                (key, json.dumps(value, default=str), expires)
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                conn.execute('DELETE FROM analysis_cache WHERE expires < ?', (time.time(),))
+        except Exception as e:
+            print(f"Analysis cache write error: {e}")
+
+    def get_or_compute(self, namespace: str, parts: tuple, compute: Callable[[], Any],
+                       ttl: Optional[float] = None, cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return the cached result for (namespace, *parts), computing and storing it on a miss"""
+        key = stable_hash(namespace, *parts)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        if value is not None and (cacheable is None or cacheable(value)):
+            self.set(key, value, ttl)
+        return value
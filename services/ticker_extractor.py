@@ -0,0 +1,117 @@
+import re
+import json
+from typing import Dict, List, Optional
+from .keyword_matcher import KeywordMatcher
+
+_CASHTAG_RE = re.compile(r'(?<![\w$])\$([A-Za-z]{1,5}(?:\.[A-Za-z])?)\b')
+_EXCHANGE_RE = re.compile(r'\((?:NYSE|NASDAQ|Nasdaq|NYSEAMERICAN|AMEX|OTC)\s*:\s*([A-Z]{1,5}(?:\.[A-Z])?)\)')
+_TAG_RE = re.compile(r'<[^>]+>')
+_COMPANY_CONTEXT_RE = re.compile(
+    r"(?:'s\b|\s+(?:Inc\b|Corp\b|Corporation\b|Co\.|Ltd\b|Holdings\b|Platforms\b|Technology\b|"
+    r"Motor\b|shares\b|stock\b|\((?:NYSE|NASDAQ|Nasdaq)\b))"
+)
+_SHARES_OF_RE = re.compile(r'\bshares of\s+$', re.IGNORECASE)
+
+# Company names as they appear in headlines; extend with TICKER_DICTIONARY_PATH ({"name": "SYMBOL"})
+COMPANY_NAMES = {
+    'apple': 'AAPL', 'microsoft': 'MSFT', 'alphabet': 'GOOGL', 'google': 'GOOGL', 'amazon': 'AMZN',
+    'tesla': 'TSLA', 'nvidia': 'NVDA', 'meta platforms': 'META', 'meta': 'META', 'facebook': 'META',
+    'netflix': 'NFLX', 'advanced micro devices': 'AMD', 'amd': 'AMD', 'adobe': 'ADBE', 'palantir': 'PLTR',
+    'roblox': 'RBLX', 'snowflake': 'SNOW', 'crowdstrike': 'CRWD', 'zoom video': 'ZM', 'peloton': 'PTON',
+    'block inc': 'SQ', 'paypal': 'PYPL', 'shopify': 'SHOP', 'roku': 'ROKU', 'blackberry': 'BB',
+    'sofi': 'SOFI', 'lucid': 'LCID', 'rivian': 'RIVN', 'ford': 'F', 'intel': 'INTC', 'broadcom': 'AVGO',
+    'qualcomm': 'QCOM', 'micron': 'MU', 'super micro': 'SMCI', 'oracle': 'ORCL', 'salesforce': 'CRM',
+    'ibm': 'IBM', 'jpmorgan': 'JPM', 'goldman sachs': 'GS', 'bank of america': 'BAC', 'wells fargo': 'WFC',
+    'morgan stanley': 'MS', 'berkshire hathaway': 'BRK.B', 'walmart': 'WMT', 'costco': 'COST',
+    'disney': 'DIS', 'boeing': 'BA', 'pfizer': 'PFE', 'moderna': 'MRNA', 'johnson & johnson': 'JNJ',
+    'eli lilly': 'LLY', 'exxon': 'XOM', 'chevron': 'CVX', 'coinbase': 'COIN', 'uber': 'UBER',
+    'airbnb': 'ABNB', 'starbucks': 'SBUX', 'nike': 'NKE', "mcdonald's": 'MCD', 'coca-cola': 'KO',
+    'visa': 'V', 'mastercard': 'MA', 'general motors': 'GM', 'gamestop': 'GME', 'amc entertainment': 'AMC'
+}
+
+# Names that are also ordinary words, with the neighbouring words that mark the ordinary use
+# ("travel visa", "visa rules", "meta analysis", "intel on"): {name: (words before, words after)}.
+# A capitalized mention counts unless one of those neighbours applies; a lowercase one needs
+# company context (a corporate suffix, "shares"/"stock" or a possessive after it, or "shares of"
+# before it), which also overrides the neighbour check
+COMMON_WORD_NAMES = {
+    'visa': (
+        {'travel', 'student', 'students', 'work', 'tourist', 'entry', 'golden', 'h-1b', 'h1b', 'exit',
+         'immigrant', 'immigration', 'transit', 'business', 'expired', 'skilled'},
+        {'rules', 'rule', 'application', 'applications', 'applicants', 'holders', 'program', 'programs',
+         'policy', 'policies', 'requirements', 'restrictions', 'ban', 'bans', 'waiver', 'fees', 'backlog',
+         'backlogs', 'overstays', 'interview', 'interviews', 'lottery', 'cap', 'caps', 'process'}
+    ),
+    'meta': ((), {'analysis', 'analyses', 'data', 'description', 'descriptions', 'tag', 'tags', 'study',
+                  'studies', 'review', 'reviews'}),
+    'intel': (
+        {'military', 'defense', 'defence', 'u.s.', 'us', 'western', 'russian', 'israeli', 'ukrainian',
+         'british', 'fresh', 'new', 'gather', 'gathers', 'gathering'},
+        {'on', 'about', 'agency', 'agencies', 'officials', 'community', 'chief', 'chiefs', 'sources',
+         'sharing', 'failure', 'failures'}
+    ),
+    'apple': ({'big', 'candy', 'toffee'}, {'pie', 'pies', 'orchard', 'orchards', 'juice', 'cider', 'harvest',
+                                           'growers', 'trees', 'tree', 'crop', 'crops', 'farmers', 'prices'}),
+    'amazon': ((), {'rainforest', 'basin', 'river', 'jungle', 'deforestation', 'fires', 'tribes', 'forest'}),
+    'alphabet': ({'english', 'latin', 'greek', 'cyrillic', 'phonetic'}, {'soup', 'letters', 'letter'}),
+    'oracle': ((), {'of'}),
+    'ford': ({'harrison', 'gerald', 'betty', 'tom', 'henry', 'glenn'}, {'foundation'}),
+    'chevron': ((), {'deference', 'doctrine', 'ruling', 'decision', 'precedent'}),
+    'lucid': ((), {'dream', 'dreams', 'dreaming', 'moment', 'moments'}),
+    'snowflake': ((), {'storm', 'storms', 'generation', 'obsidian'}),
+    'blackberry': ((), {'bush', 'bushes', 'jam', 'picking', 'pie'}),
+    'micron': ((), {'thick', 'thin', 'wide', 'sized', 'scale'}),
+    'peloton': ((), ()),
+    'uber': ((), ()),
+}
+_NEXT_WORD_RE = re.compile(r"[\s-]+([A-Za-z][\w.'-]*)")
+_PREV_WORD_RE = re.compile(r"([A-Za-z][\w.'-]*)[\s-]+$")
+
+
+class TickerExtractor:
+    """Symbols mentioned in text: cashtags, exchange tags like "(NASDAQ: NVDA)" and company names"""
+
+    def __init__(self, company_names: Optional[Dict[str, str]] = None, dictionary_path: Optional[str] = None,
+                 common_word_names: Optional[Dict[str, tuple]] = None):
+        generic_uses = common_word_names if common_word_names is not None else COMMON_WORD_NAMES
+        self.generic_uses = {
+            name.lower(): ({w.lower() for w in before}, {w.lower() for w in after})
+            for name, (before, after) in generic_uses.items()
+        }
+        names = dict(company_names if company_names is not None else COMPANY_NAMES)
+        if dictionary_path:
+            try:
+                with open(dictionary_path) as f:
+                    names.update({name.lower(): symbol.upper() for name, symbol in json.load(f).items()})
+            except Exception as e:
+                print(f"Ticker dictionary load error: {e}")
+        self.name_matcher = KeywordMatcher(names)
+
+    def extract(self, *texts: str) -> List[str]:
+        """Distinct symbols: explicit cashtags and exchange tags first, then company-name mentions"""
+        symbols = []
+        for text in texts:
+            if not text:
+                continue
+            text = _TAG_RE.sub(' ', text)
+            for symbol in _CASHTAG_RE.findall(text) + _EXCHANGE_RE.findall(text):
+                symbols.append(symbol.upper())
+            for start, end, symbol in self.name_matcher.find(text):
+                generic_use = self.generic_uses.get(text[start:end].lower())
+                if generic_use is not None and not _is_company_mention(text, start, end, *generic_use):
+                    continue
+                symbols.append(symbol)
+        return list(dict.fromkeys(symbols))
+
+
+def _is_company_mention(text: str, start: int, end: int, before: set, after: set) -> bool:
+    """Company context wins; otherwise capitalized and not next to a word that marks the ordinary use"""
+    if _SHARES_OF_RE.search(text, 0, start) or _COMPANY_CONTEXT_RE.match(text, end):
+        return True
+    if not text[start].isupper():
+        return False
+    following = _NEXT_WORD_RE.match(text, end)
+    if following and following.group(1).lower().rstrip('.,') in after:
+        return False
+    preceding = _PREV_WORD_RE.search(text, 0, start)
+    return not (preceding and preceding.group(1).lower() in before)
@@ -0,0 +1,201 @@
+import os
+import time
+import warnings
+import threading
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional
+from .gap_scanner import MARKET_TZ, REGULAR_OPEN_MINUTE, REGULAR_CLOSE_MINUTE
+
+SESSION_MINUTES = REGULAR_CLOSE_MINUTE - REGULAR_OPEN_MINUTE  # 390 one-minute buckets
+
+
+def build_cumulative_curves(volume: pd.DataFrame) -> np.ndarray:
+    """Median cumulative intraday volume curve per symbol.
+
+    `volume` is a (1-minute bar x symbol) frame. Regular-session bars are
+    scattered into a (day, minute, symbol) block, cumulated along the minute
+    axis and reduced with a median across days, giving a float32 array of
+    shape (symbols, 390). Days a symbol did not trade are ignored.
+    """
+    index = volume.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    index = index.tz_convert(MARKET_TZ)
+
+    minutes = index.hour * 60 + index.minute - REGULAR_OPEN_MINUTE
+    regular = (minutes >= 0) & (minutes < SESSION_MINUTES)
+    values = volume.to_numpy(dtype=float)[regular]
+    minutes = np.asarray(minutes[regular])
+    day_codes, days = pd.factorize(index[regular].normalize())
+
+    block = np.zeros((len(days), SESSION_MINUTES, volume.shape[1]))
+    block[day_codes, minutes] = np.nan_to_num(values)
+    curves = np.cumsum(block, axis=1)
+
+    traded = curves[:, -1, :] > 0
+    curves[~np.broadcast_to(traded[:, None, :], curves.shape)] = np.nan
+    with warnings.catch_warnings():
+        # All-NaN slices are symbols with no trading days at all
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(curves, axis=0)
+    return median.T.astype(np.float32)
+
+
+class VolumeProfileStore:
+    """Expected cumulative volume by minute of the session, for O(1) RVOL lookups"""
+
+    def __init__(self, path: Optional[str] = 'data/volume_profiles.npz', lookback: str = '7d', chunk_size: int = 200):
+        self.path = path
+        self.lookback = lookback
+        self.chunk_size = chunk_size
+        self.curves = np.zeros((0, SESSION_MINUTES), dtype=np.float32)
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.last_refresh = None
+        self.is_refreshing = False
+
+        if self.path and os.path.exists(self.path):
+            self.load()
+
+    def has_profile(self, symbol: str) -> bool:
+        return symbol in self._rows
+
+    def expected_volume(self, symbol: str, at: Optional[datetime] = None) -> Optional[float]:
+        """Typical cumulative volume traded by this minute of the session"""
+        row = self._rows.get(symbol)
+        if row is None:
+            return None
+
+        bucket = self._minute_bucket(at)
+        if bucket is None:
+            return None
+
+        expected = self.curves[row, bucket]
+        if not np.isfinite(expected) or expected <= 0:
+            return None
+        return float(expected)
+
+    def relative_volume(self, symbol: str, cumulative_volume: float, at: Optional[datetime] = None) -> Optional[float]:
+        """Cumulative session volume over the volume normally traded by the same time of day"""
+        expected = self.expected_volume(symbol, at)
+        if expected is None:
+            return None
+        return float(cumulative_volume) / expected
+
+    def _minute_bucket(self, at: Optional[datetime]) -> Optional[int]:
+        stamp = pd.Timestamp(at or datetime.now(ZoneInfo(MARKET_TZ)))
+        stamp = stamp.tz_localize(MARKET_TZ) if stamp.tzinfo is None else stamp.tz_convert(MARKET_TZ)
+        minute = stamp.hour * 60 + stamp.minute - REGULAR_OPEN_MINUTE
+        if minute < 0:
+            return None
+        return min(minute, SESSION_MINUTES - 1)
+
+    def refresh(self, symbols: List[str]) -> int:
+        """Rebuild curves for the given symbols from recent 1-minute bars"""
+        updated = {}
+
+        for start in range(0, len(symbols), self.chunk_size):
+            chunk = symbols[start:start + self.chunk_size]
+            try:
+                bars = yf.download(
+                    chunk,
+                    period=self.lookback,
+                    interval='1m',
+                    group_by='column',
+                    auto_adjust=False,
+                    threads=True,
+                    progress=False
+                )
+                if bars.empty:
+                    continue
+
+                volume = bars['Volume']
+                if isinstance(volume, pd.Series):
+                    volume = volume.to_frame(chunk[0])
+
+                curves = build_cumulative_curves(volume)
+                for symbol, curve in zip(volume.columns, curves):
+                    if np.isfinite(curve[-1]):
+                        updated[symbol] = curve
+
+            except Exception as e:
+                print(f"Volume profile refresh error for chunk starting at {chunk[0]}: {e}")
+                continue
+
+        self._merge(updated)
+        self.last_refresh = datetime.now()
+        if self.path:
+            self.save()
+        return len(updated)
+
+    def _merge(self, updated: Dict[str, np.ndarray]):
+        with self._lock:
+            rows = dict(self._rows)
+            new_symbols = [s for s in updated if s not in rows]
+            curves = np.vstack([self.curves, np.zeros((len(new_symbols), SESSION_MINUTES), dtype=np.float32)])
+            for symbol in new_symbols:
+                rows[symbol] = len(rows)
+            for symbol, curve in updated.items():
+                curves[rows[symbol]] = curve
+            # Publish the new array before the index that points into it
+            self.curves = curves
+            self._rows = rows
+
+    def save(self):
+        """Persist curves as a compressed .npz"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                symbols = sorted(self._rows, key=self._rows.get)
+                np.savez_compressed(self.path, symbols=np.array(symbols), curves=self.curves,
+                                    refreshed=np.array(self.last_refresh.isoformat() if self.last_refresh else ''))
+        except Exception as e:
+            print(f"Volume profile save error: {e}")
+
+    def load(self):
+        """Load curves saved by a previous refresh"""
+        try:
+            with np.load(self.path) as data:
+                symbols = [str(s) for s in data['symbols']]
+                curves = data['curves'].astype(np.float32)
+                refreshed = str(data['refreshed'])
+            with self._lock:
+                self.curves = curves
+                self._rows = {s: i for i, s in enumerate(symbols)}
+            self.last_refresh = datetime.fromisoformat(refreshed) if refreshed else None
+        except Exception as e:
+            print(f"Volume profile load error: {e}")
+
+    def start_nightly_refresh(self, symbols: List[str], hour: int = 20):
+        """Refresh the given symbols once a day after the close"""
+        def refresh_loop():
+            self.is_refreshing = True
+            due = (self.last_refresh is None or datetime.now() - self.last_refresh > timedelta(days=1)
+                   or not all(self.has_profile(s) for s in symbols))
+            while self.is_refreshing:
+                try:
+                    now = datetime.now()
+                    if due:
+                        print(f"📈 Refreshing volume profiles for {len(symbols)} symbols at {now}")
+                        self.refresh(symbols)
+
+                    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+                    if next_run <= datetime.now():
+                        next_run += timedelta(days=1)
+                    time.sleep((next_run - datetime.now()).total_seconds())
+                    due = True
+                except Exception as e:
+                    print(f"Volume profile refresh error: {e}")
+                    time.sleep(3600)
+
+        refresh_thread = threading.Thread(target=refresh_loop, daemon=True)
+        refresh_thread.start()
+
+    def stop_nightly_refresh(self):
+        self.is_refreshing = False
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def analysis_cache_path(tmp_path, monkeypatch):
+    """Keep OpenAIService's shared analysis cache out of the working tree"""
+    monkeypatch.setenv('ANALYSIS_CACHE_PATH', str(tmp_path / 'analysis_cache.db'))
@@ -0,0 +1,49 @@
+import json
+
+from services.openai_service import OpenAIService
+
+
+def rows(count):
+    return [{'symbol': f'S{i}', 'price': 10.0 + i, 'change_percent': 1.0} for i in range(count)]
+
+
+def test_outage_does_not_bisect(monkeypatch):
+    service = OpenAIService()
+    calls = []
+    monkeypatch.setattr(service, '_call_llm', lambda *args, **kwargs: calls.append(args) or None)
+
+    results = service.analyze_symbols_batch(rows(20), batch_size=10)
+
+    assert len(calls) == 1
+    assert results == {f'S{i}': None for i in range(20)}
+
+
+def test_unparseable_reply_is_split(monkeypatch):
+    service = OpenAIService()
+    calls = []
+
+    def reply(prompt, *args, **kwargs):
+        calls.append(prompt)
+        symbols = [line.split()[0] for line in prompt.splitlines() if line.startswith('S')]
+        if len(symbols) > 1:
+            return 'not json'
+        return json.dumps({'results': [{'symbol': symbols[0], 'signal': 'buy', 'confidence': 60}]})
+
+    monkeypatch.setattr(service, '_call_llm', reply)
+
+    results = service.analyze_symbols_batch(rows(2), batch_size=2)
+
+    assert len(calls) == 3
+    assert results['S0']['signal'] == 'BUY' and results['S1']['signal'] == 'BUY'
+
+
+def test_batch_rows_are_budgeted_single_lines():
+    service = OpenAIService()
+    row = {'symbol': 'AAPL', 'price': 190.12, 'change_percent': 1.2, 'rvol': 2.3,
+           'analysis': {'strategy': 'BREAKOUT', 'signal_strength': 78},
+           'news': [{'title': f'Apple headline number {i} about the new lineup'} for i in range(20)]}
+
+    line = service._compact_feature_row(row)
+
+    assert '\n' not in line and line.startswith('AAPL px 190.12')
+    assert service.context_builder.count(line) <= service.batch_row_budget
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from services import scanner_service as scanner_module
+from services.scanner_service import ScannerService
+
+
+def hourly_closes(end, bars):
+    index = pd.date_range(end=end, periods=bars, freq='1h', tz='America/New_York')
+    walk = np.cumsum(np.random.default_rng(0).normal(0, 0.01, bars))
+    closes = pd.DataFrame({'AAA': 100 * np.exp(walk), 'BBB': 50 * np.exp(walk)}, index=index)
+    return pd.concat({'Close': closes}, axis=1)
+
+
+def test_correlation_is_fed_completed_hourly_bars_once(monkeypatch):
+    now = pd.Timestamp.now(tz='America/New_York').floor('h')
+    downloads = []
+
+    def fake_download(symbols, period, interval, **kwargs):
+        downloads.append((period, interval))
+        # The last bar starts this hour and is still forming
+        return hourly_closes(now, 60)
+
+    monkeypatch.setattr(scanner_module.yf, 'download', fake_download)
+    scanner = ScannerService(market_data_service=object())
+
+    scanner._update_correlation(['AAA', 'BBB'])
+    scanner._update_correlation(['AAA', 'BBB'])
+
+    assert downloads == [('1mo', '1h')]
+    assert scanner.correlation_last_bar == (now - pd.Timedelta(hours=1)).tz_convert('UTC')
+    assert scanner.correlation._count[:2].tolist() == [58, 58]
+    assert scanner.correlation.correlation('AAA', 'BBB') > 0.99
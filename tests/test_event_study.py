@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from services.event_study import compute_abnormal_returns
+
+WINDOWS = {'pre_10m': (-2, 0), '5m': (0, 1), '10m': (0, 2)}
+
+
+def closes_with_jump():
+    """5-minute bars from 13:30; the stock jumps 10% during the 14:05 bar, the benchmark is flat"""
+    index = pd.date_range('2024-03-04 13:30', periods=12, freq='5min', tz='America/New_York')
+    stock = np.where(index >= pd.Timestamp('2024-03-04 14:05', tz='America/New_York'), 110.0, 100.0)
+    return pd.DataFrame({'SPY': 500.0, 'ABC': stock}, index=index)
+
+
+def test_jump_inside_event_bar_lands_in_post_window():
+    closes = closes_with_jump()
+    event = pd.Timestamp('2024-03-04 14:07', tz='America/New_York').timestamp()
+
+    returns = compute_abnormal_returns(closes, closes['SPY'], np.array([event]), np.array(['ABC']), WINDOWS)
+
+    pre, first, second = returns[0]
+    assert pre == 0.0
+    assert np.isclose(first, 0.10)
+    assert np.isclose(second, 0.10)
+
+
+def test_event_on_bar_close_anchors_on_that_bar():
+    closes = closes_with_jump()
+    event = pd.Timestamp('2024-03-04 14:05', tz='America/New_York').timestamp()
+
+    returns = compute_abnormal_returns(closes, closes['SPY'], np.array([event]), np.array(['ABC']), WINDOWS)
+
+    # The 14:00 bar closed at 14:05, so it is the anchor and the jump is the next bar
+    assert returns[0, 0] == 0.0
+    assert np.isclose(returns[0, 1], 0.10)
+
+
+def test_unknown_symbol_and_out_of_range_events_are_nan():
+    closes = closes_with_jump()
+    before = pd.Timestamp('2024-03-04 13:31', tz='America/New_York').timestamp()
+    event = pd.Timestamp('2024-03-04 14:07', tz='America/New_York').timestamp()
+
+    returns = compute_abnormal_returns(closes, closes['SPY'], np.array([event, before]),
+                                       np.array(['XYZ', 'ABC']), WINDOWS)
+
+    assert np.isnan(returns).all()
@@ -0,0 +1,36 @@
+from services.openai_service import OpenAIService
+
+
+def test_malformed_expert_fields_fall_back_per_field(monkeypatch):
+    service = OpenAIService()
+    answers = {
+        'Technical Titan': {'target_1': None, 'target_2': 'soon', 'target_3': '130', 'stop_loss': 90,
+                            'confidence': '80%', 'analysis': 'Breakout'},
+        'Fundamental Prophet': {'target_1': 110},
+        'Sentiment Sage': None
+    }
+    monkeypatch.setattr(service, '_fan_out', lambda *args, **kwargs: (answers, []))
+
+    result = service._compute_multi_brain_analysis('AAPL', {'price': 100.0, 'change_percent': 1.0})
+
+    assert 'error' not in result
+    titan = result['experts'][0]
+    assert titan['target_1'] == 105.0 and titan['target_2'] == 112.0 and titan['target_3'] == 130.0
+    assert titan['confidence'] == 80.0 and titan['analysis'] == 'Breakout'
+    assert result['team_consensus']['target_1'] == round((105.0 + 110.0 + 106.0) / 3, 2)
+
+
+def test_malformed_swarm_reply_keeps_consensus(monkeypatch):
+    service = OpenAIService()
+    answers = {name: {'signal': None, 'confidence': 'high'} for name, _ in service.swarm_agents}
+    answers['Risk Realist'] = {'signal': 'sell', 'confidence': 65}
+    monkeypatch.setattr(service, '_fan_out', lambda *args, **kwargs: (answers, []))
+
+    result = service._compute_swarm_analysis('AAPL')
+
+    assert 'error' not in result
+    agents = {agent['name']: agent for agent in result['agents']}
+    assert agents['Risk Realist']['signal'] == 'SELL' and agents['Risk Realist']['confidence'] == 65.0
+    fallback = service._swarm_fallback('Technical Titan', 'AAPL')
+    assert agents['Technical Titan']['signal'] == fallback['signal']
+    assert agents['Technical Titan']['confidence'] == fallback['confidence']
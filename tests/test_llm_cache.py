@@ -0,0 +1,71 @@
+import sqlite3
+import time
+
+from services.llm_cache import LLMResponseCache
+from services.openai_service import OpenAIService
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.text = text
+
+    def json(self):
+        return {'content': [{'text': self.text}], 'usage': {'input_tokens': 10, 'output_tokens': 5}}
+
+
+def test_anthropic_cache_key_includes_system_prompt(monkeypatch, tmp_path):
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    service = OpenAIService()
+    service.response_cache = LLMResponseCache(path=None)
+    posted = []
+
+    def post(url, headers=None, json=None, timeout=None):
+        posted.append(json['system'])
+        return FakeResponse(f"reply for {json['system']}")
+
+    monkeypatch.setattr('services.openai_service.requests.post', post)
+
+    service.system_prompt = 'You are a risk manager.'
+    first = service._call_anthropic_api('Rate AAPL')
+    service.system_prompt = 'You are a momentum trader.'
+    second = service._call_anthropic_api('Rate AAPL')
+    third = service._call_anthropic_api('Rate AAPL')
+
+    assert first == 'reply for You are a risk manager.'
+    assert second == third == 'reply for You are a momentum trader.'
+    assert len(posted) == 2
+
+
+def test_disk_table_is_pruned_and_capped(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = LLMResponseCache(path=path, max_rows=50, stale_grace=60, prune_every=10)
+    cache.set('long-expired', 'old', ttl=-3600)
+    cache.set('recently-expired', 'stale', ttl=-1)
+    for i in range(100):
+        cache.set(f'key-{i}', f'value-{i}', ttl=300 + i)
+
+    with sqlite3.connect(path) as conn:
+        keys = {row[0] for row in conn.execute('SELECT key FROM llm_responses')}
+
+    assert 'long-expired' not in keys
+    assert len(keys) <= 60
+    assert 'key-99' in keys
+    assert cache.get_stale('key-99') == 'value-99'
+
+
+def test_stale_reply_survives_within_grace(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / 'cache.db'), stale_grace=3600, prune_every=1)
+    cache.set('k', 'stale answer', ttl=-1)
+    cache.set('other', 'fresh')
+
+    reopened = LLMResponseCache(path=str(tmp_path / 'cache.db'))
+
+    assert reopened.get('k') is None
+    assert reopened.get_stale('k') == 'stale answer'
+
+
+def test_connection_is_reused_per_thread(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / 'cache.db'))
+    assert cache._connection() is cache._connection()
@@ -0,0 +1,88 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.news_room import NewsRoomService
+
+FEED = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>
+<item><title>Story %d</title><link>http://example.com/%d</link></item></channel></rss>"""
+
+
+class SlowFeed(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.5)
+        number = int(self.path.strip('/'))
+        body = FEED % (number, number)
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowFeed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_queued_feeds_get_their_own_timeout(feed_server, tmp_path, monkeypatch):
+    monkeypatch.setenv('NEWS_ARCHIVE_PATH', str(tmp_path / 'archive.db'))
+    monkeypatch.setenv('NEWS_FETCH_CONCURRENCY', '4')
+    service = NewsRoomService()
+    # Four workers, twenty half-second feeds: the last ones start ~2s after being queued
+    service.news_sources = [f'{feed_server}/{i}' for i in range(20)]
+    service.feed_timeout = 1.0
+    service.refresh_deadline = 8.0
+
+    service._fetch_latest_news()
+
+    assert all(service.feed_status[url]['ok'] for url in service.news_sources)
+    assert len(service.news_index) == 20
+
+
+class RotatingETagFeed(BaseHTTPRequestHandler):
+    """Sends the same body under a new ETag once, then honours If-None-Match"""
+    seen = []
+    version = 0
+
+    def do_GET(self):
+        cls = type(self)
+        etag = self.headers.get('If-None-Match')
+        cls.seen.append(etag)
+        if cls.version >= 2 and etag == f'"v{cls.version}"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        cls.version += 1
+        body = FEED % (1, 1)
+        self.send_response(200)
+        self.send_header('ETag', f'"v{cls.version}"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_unchanged_body_keeps_the_new_validators(tmp_path, monkeypatch):
+    monkeypatch.setenv('NEWS_ARCHIVE_PATH', str(tmp_path / 'archive.db'))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RotatingETagFeed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/feed'
+    try:
+        service = NewsRoomService()
+        for _ in range(3):
+            items = service._fetch_feed(url).result(timeout=5)
+    finally:
+        server.shutdown()
+
+    assert RotatingETagFeed.seen == [None, '"v1"', '"v2"']
+    assert service.feed_status[url]['not_modified'] and len(items) == 1
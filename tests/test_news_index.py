@@ -0,0 +1,26 @@
+from services.news_index import NewsIndex
+
+
+def news(item_id, published_ts):
+    return {'id': item_id, 'published_ts': published_ts, 'symbols': ['AAPL']}
+
+
+def test_evicted_item_is_not_new_again():
+    index = NewsIndex(max_items=3)
+    assert index.add_many([news(f'n{i}', 100.0 + i) for i in range(4)]) != []
+    assert 'n0' not in index
+
+    # Feeds keep serving the evicted story; it must not count as new on every poll
+    for _ in range(3):
+        assert index.add(news('n0', 100.0)) is False
+    assert [item['id'] for item in index.latest(10)] == ['n3', 'n2', 'n1']
+    assert index.symbol_counts() == {'AAPL': 3}
+
+
+def test_full_index_still_takes_newer_items():
+    index = NewsIndex(max_items=2)
+    index.add_many([news('a', 1.0), news('b', 2.0)])
+
+    assert index.add(news('old', 0.5)) is False
+    assert index.add(news('c', 3.0)) is True
+    assert [item['id'] for item in index.latest(10)] == ['c', 'b']
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from services.options_flow import OptionsFlowDetector
+
+
+def chain(volumes, expiration='2099-03-20'):
+    return pd.DataFrame({
+        'contractSymbol': [f'ABC{expiration[2:].replace("-", "")}C00{strike}000' for strike in (100, 105, 110)],
+        'expiration': expiration,
+        'strike': [100.0, 105.0, 110.0],
+        'option_type': 'call',
+        'volume': volumes,
+        'openInterest': [100, 100, 100],
+        'bid': [2.0, 1.5, 1.0],
+        'ask': [2.2, 1.7, 1.2],
+        'lastPrice': [2.1, 1.6, 1.1]
+    })
+
+
+def test_first_snapshot_is_only_a_baseline():
+    detector = OptionsFlowDetector()
+
+    assert detector.update('ABC', chain([5000, 6000, 7000])) == []
+    assert detector.tracked_contracts() == 3
+    assert not detector.get_recent_alerts()
+
+
+def test_flow_comes_from_volume_delta_after_baseline():
+    detector = OptionsFlowDetector()
+    detector.update('ABC', chain([5000, 6000, 7000]))
+
+    flow = detector.update('ABC', chain([5000, 6400, 7000]))
+
+    assert [item['strike'] for item in flow] == ['105.0']
+    assert flow[0]['volume'] == 400
+    assert flow[0]['dayVolume'] == 6400
+
+
+def test_volume_over_oi_alerts_once_on_the_crossing():
+    detector = OptionsFlowDetector(min_volume=500)
+    detector.update('ABC', chain([100, 100, 100]))
+
+    crossed = detector.update('ABC', chain([600, 100, 100]))
+    later = detector.update('ABC', chain([900, 100, 100]))
+
+    assert crossed[0]['reasons'] == ['VOLUME_OVER_OI']
+    assert later[0]['volume'] == 300 and 'VOLUME_OVER_OI' not in later[0]['reasons']
+    assert len(detector.get_recent_alerts()) == 1
+
+
+def test_expired_expirations_are_dropped():
+    detector = OptionsFlowDetector()
+    detector.update('ABC', chain([100, 100, 100]))
+    # An expiration already past is forgotten as soon as its snapshot is taken
+    detector.update('ABC', chain([100, 100, 100], expiration='2001-01-19'))
+    assert detector.tracked_contracts() == 3
+
+    assert detector.prune_expired(today='2099-03-20') == 0
+    assert detector.prune_expired(today='2099-03-21') == 1
+    assert detector.tracked_contracts() == 0
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone, timedelta
+
+from services.options_math import DAYS_PER_YEAR, year_fraction
+
+
+def hours(years):
+    return years * DAYS_PER_YEAR * 24
+
+
+def test_year_fraction_runs_to_the_new_york_close():
+    # 19:00 UTC on a March expiry (EDT) is one hour before the 16:00 close
+    assert hours(year_fraction('2024-03-15', datetime(2024, 3, 15, 19, 0, tzinfo=timezone.utc))) == 1.0
+    # The same instant seen from a Tokyo host
+    tokyo = datetime(2024, 3, 16, 4, 0, tzinfo=timezone(timedelta(hours=9)))
+    assert hours(year_fraction('2024-03-15', tokyo)) == 1.0
+    assert year_fraction('2024-03-15', datetime(2024, 3, 15, 21, 0, tzinfo=timezone.utc)) == 0.0
+
+
+def test_naive_now_is_new_york_time():
+    assert hours(year_fraction('2024-01-19', datetime(2024, 1, 19, 10, 0))) == 6.0
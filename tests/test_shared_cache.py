@@ -0,0 +1,24 @@
+from services.shared_cache import SharedAnalysisCache
+
+
+def test_results_are_shared_through_the_database(tmp_path):
+    path = str(tmp_path / 'analysis.db')
+    SharedAnalysisCache(path=path).get_or_compute('swarm', ('AAPL',), lambda: {'consensus': 'BUY'})
+
+    calls = []
+    result = SharedAnalysisCache(path=path).get_or_compute('swarm', ('AAPL',), lambda: calls.append(1))
+
+    assert result == {'consensus': 'BUY'} and calls == []
+
+
+def test_unusable_path_disables_caching(tmp_path):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    cache = SharedAnalysisCache(path=str(blocker / 'analysis.db'))
+
+    assert cache.path is None
+    calls = []
+    for _ in range(2):
+        result = cache.get_or_compute('swarm', ('AAPL',), lambda: calls.append(1) or {'consensus': 'HOLD'})
+        assert result == {'consensus': 'HOLD'}
+    assert len(calls) == 2
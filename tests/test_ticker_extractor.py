@@ -0,0 +1,44 @@
+import pytest
+
+from services.ticker_extractor import TickerExtractor
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return TickerExtractor()
+
+
+@pytest.mark.parametrize('headline', [
+    'US tightens visa rules for foreign students',
+    'Travel Visa Rules Tighten For Students',
+    'Visa applications surge at embassies',
+    'Meta analysis finds diet benefit',
+    'Fund managers seek intel on rate path',
+    'Apple orchards hit by late frost',
+    'Amazon rainforest fires spread',
+    'Supreme Court overturns Chevron deference',
+    'Oracle of Omaha trims bank holdings',
+])
+def test_common_words_are_not_tickers(extractor, headline):
+    assert extractor.extract(headline) == []
+
+
+@pytest.mark.parametrize('headline, symbols', [
+    ('Visa Inc. beats estimates', ['V']),
+    ('Visa shares rise after earnings', ['V']),
+    ("Visa's quarterly revenue tops forecasts", ['V']),
+    ('Payments stocks climb as Visa and Mastercard report', ['V', 'MA']),
+    ('Analysts upgrade shares of Apple', ['AAPL']),
+    ('Investors cheer Meta Platforms results', ['META']),
+    ('Tesla and Nvidia rally', ['TSLA', 'NVDA']),
+    ('Chip stocks slide (NASDAQ: INTC) as $AMD holds', ['AMD', 'INTC']),
+    ('Apple unveils new iPhone lineup', ['AAPL']),
+    ('Amazon to buy drugstore chain', ['AMZN']),
+    ('Intel cuts jobs as chip sales slump', ['INTC']),
+    ('Oracle Reports Strong Cloud Growth', ['ORCL']),
+    ('Uber posts first annual profit', ['UBER']),
+    ('Meta launches Threads app', ['META']),
+    ('Earnings beat. Visa raises guidance', ['V']),
+])
+def test_company_mentions_are_tagged(extractor, headline, symbols):
+    assert extractor.extract(headline) == symbols
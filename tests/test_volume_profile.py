@@ -0,0 +1,61 @@
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from services import market_data as market_data_module
+from services import volume_profile as volume_profile_module
+from services.market_data import MarketDataService
+from services.volume_profile import VolumeProfileStore
+
+
+def minute_bars(day: str, minutes: int) -> pd.DatetimeIndex:
+    start = pd.Timestamp(f'{day} 09:30', tz='America/New_York')
+    return pd.date_range(start, periods=minutes, freq='1min')
+
+
+class FakeTicker:
+    def __init__(self, symbol):
+        self.info = {'previousClose': 100.0, 'averageVolume': 1000000}
+
+    def history(self, period, interval):
+        index = minute_bars('2024-01-11', 30)
+        return pd.DataFrame({'Close': 101.0, 'Volume': 2000}, index=index)
+
+
+def fake_download(symbols, **kwargs):
+    # Three full sessions trading 1000 shares a minute
+    index = minute_bars('2024-01-08', 390)
+    for day in ('2024-01-09', '2024-01-10'):
+        index = index.append(minute_bars(day, 390))
+    columns = pd.MultiIndex.from_product([['Volume'], symbols])
+    return pd.DataFrame(1000.0, index=index, columns=columns)
+
+
+def test_startup_builds_profiles_and_populates_rvol(monkeypatch):
+    monkeypatch.setattr(volume_profile_module.yf, 'download', fake_download)
+    monkeypatch.setattr(market_data_module.yf, 'Ticker', FakeTicker)
+
+    service = MarketDataService()
+    service.volume_profiles = VolumeProfileStore(path=None)
+    service.options_watchlist = []
+    service.start_volume_profiles(['AAPL'])
+    try:
+        deadline = time.time() + 5
+        while not service.volume_profiles.has_profile('AAPL') and time.time() < deadline:
+            time.sleep(0.05)
+
+        data = service.get_stock_data('AAPL')
+    finally:
+        service.volume_profiles.stop_nightly_refresh()
+
+    # 30 minutes at 2000 shares against a typical 30 minutes at 1000
+    assert data['rvol'] == 2.0
+    assert service.get_volume_ratio(data) == 2.0
+
+
+def test_minute_bucket_reads_market_time():
+    store = VolumeProfileStore(path=None)
+    # 15:00 UTC in January is 10:00 in New York, 30 minutes into the session
+    assert store._minute_bucket(datetime(2024, 1, 10, 15, 0, tzinfo=timezone.utc)) == 30
+    assert store._minute_bucket(datetime(2024, 1, 10, 14, 0, tzinfo=timezone.utc)) is None